@@ -1,6 +1,17 @@
+from . import controllers
 from . import models
 from . import reports
 
+
+def backfill_derived_data(env):
+    """Build the data derived from existing records, on install and on upgrade."""
+    # Inspection-due index for vehicles inspected before installation
+    env['fleet.vehicle'].with_context(active_test=False).search([])._refresh_inspection_index()
+    env['fleet.vehicle']._recompute_maintenance_rollups()
+    env['insurance.claim']._rescore_duplicates()
+    env['safety.location']._recompute_extinguisher_counts()
+
+
 def post_init_hook(env):
     """Post-initialization hook to ensure models are properly loaded."""
-    # Add any post-initialization logic here if needed 
\ No newline at end of file
+    backfill_derived_data(env)
@@ -1,6 +1,6 @@
 {
     'name': 'Safety Health and Insurance',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.1.0',
     'category': 'Human Resources/Insurance',
     'summary': 'Manage office inspections, incident reporting, and insurance claims',
     'description': """
@@ -23,6 +23,9 @@
         'fleet',
         'web',
     ],
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
     'data': [
         # Security Groups first (no model dependencies)
         'security/insurance_security.xml',
@@ -32,19 +35,31 @@
         'security/ir.model.access.csv',
         # Record rules (after models are loaded)
         'security/insurance_record_rules.xml',
+        # Scheduled actions (after models are loaded)
+        'data/ir_cron_data.xml',
         # Views and actions (load all views before menu)
+        'views/safety_evidence_views.xml',
         'views/employee_suggestion_views.xml',
         'views/res_partner_views.xml',
         'views/office_inspection_views.xml',
         'views/welding_machine_inspection_views.xml',
         'views/incident_report_views.xml',
+        'views/incident_analytics_views.xml',
+        'views/root_cause_analysis_views.xml',
+        'views/safety_location_views.xml',
         'views/fire_extinguisher_views.xml',
         'views/vehicle_inspection_views.xml',
+        'views/vehicle_telematics_views.xml',
+        'views/fleet_vehicle_views.xml',
         'views/insurance_claim_views.xml',
+        'views/insurance_claim_ledger_views.xml',
+        'views/insurance_bordereau_views.xml',
         'views/insurance_type_views.xml',
         'views/accident_investigation_views.xml',
         'views/res_config_settings_views.xml',
         'views/employee_safety_induction_views.xml',
+        'views/legacy_import_views.xml',
+        'views/insurance_report_job_views.xml',
         # Menu structure after all views (to ensure actions exist)
         'views/menu_views.xml',
         # Reports last
@@ -0,0 +1,67 @@
+import tempfile
+
+from werkzeug.wsgi import wrap_file
+
+from odoo import http, _
+from odoo.http import content_disposition, request
+
+
+class FireExtinguisherInspectionController(http.Controller):
+
+    @http.route('/insurance_module/fire_extinguisher/inspection_round', type='json', auth='user', methods=['POST'])
+    def submit_inspection_round(self, rows=None, **kwargs):
+        """Create a whole round of extinguisher checks in one request.
+
+        ``rows`` is a list of dicts with a ``client_key``, the extinguisher
+        (``extinguisher_id`` or ``serial``), ``maintenance_date``,
+        ``maintenance_type``, the four check booleans and ``notes``. Retries
+        are safe: already submitted keys come back as duplicates.
+        """
+        if not isinstance(rows, list):
+            return {'error': _('A list of rows is expected.')}
+        results = request.env['fire.extinguisher.maintenance']._submit_inspection_round(rows)
+        return {'results': results}
+
+
+class InsuranceBordereauController(http.Controller):
+
+    @http.route('/insurance_module/bordereau/<int:export_id>', type='http', auth='user')
+    def download_bordereau(self, export_id, **kwargs):
+        """Stream a claims bordereau: it is written to a temporary file chunk by
+        chunk, then sent from that file, so neither step holds it in memory."""
+        export = request.env['insurance.bordereau.export'].browse(export_id).exists()
+        if not export:
+            raise request.not_found()
+        fileobj = tempfile.TemporaryFile()
+        export._write_file(fileobj)
+        return request.make_response(wrap_file(request.httprequest.environ, fileobj), headers=[
+            ('Content-Type', export._get_mimetype()),
+            ('Content-Disposition', content_disposition(export._get_file_name())),
+        ])
+
+
+class SafetyEvidenceController(http.Controller):
+
+    @http.route('/insurance_module/evidence/upload', type='json', auth='user', methods=['POST'])
+    def start_upload(self, checksum=None, **kwargs):
+        """Start a chunked evidence upload. Clients sending the SHA-1 of the file
+        get the existing evidence back without uploading it again."""
+        return request.env['safety.evidence']._start_upload(checksum)
+
+    @http.route('/insurance_module/evidence/upload/<string:upload_id>', type='http', auth='user',
+                methods=['POST'], csrf=False)
+    def upload_chunk(self, upload_id, offset=0, **kwargs):
+        """Append the raw request body to the upload, read in blocks from the
+        request stream; returns the size received so far. The raw body cannot
+        carry a CSRF token; the route needs a session and the staged file is
+        keyed by the uploading user, so another site cannot feed it."""
+        size = request.env['safety.evidence']._append_chunk(upload_id, int(offset), request.httprequest.stream)
+        return request.make_json_response({'size': size})
+
+    @http.route('/insurance_module/evidence/upload/<string:upload_id>/finish', type='json', auth='user', methods=['POST'])
+    def finish_upload(self, upload_id, name, mimetype=None, res_model=None, res_id=None, **kwargs):
+        Evidence = request.env['safety.evidence']
+        evidence = Evidence._finish_upload(upload_id, name, mimetype)
+        if res_model and res_id:
+            Evidence._link_to_record(evidence, res_model, int(res_id))
+        return {'evidence_id': evidence.id}
@@ -0,0 +1,24 @@
+from odoo import api, SUPERUSER_ID
+
+from odoo.addons.insurance_module import backfill_derived_data
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    # Lock the record rules released by pre-migrate again
+    cr.execute("""
+        UPDATE ir_model_data
+           SET noupdate = true
+         WHERE module = 'insurance_module' AND model = 'ir.rule' AND NOT noupdate
+    """)
+    # The inspection-due index, maintenance rollups and duplicate flags are
+    # only built by the post_init_hook on install
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    backfill_derived_data(env)
+    # The incident, claim and investigation forms only offer the evidence
+    # store now: move the files attached to them before into the store
+    for model, fname in (('incident.report', 'attachment_ids'),
+                         ('insurance.claim', 'document_ids'),
+                         ('accident.investigation', 'attachment_ids')):
+        env['safety.evidence']._import_attachments(env[model].search([(fname, '!=', False)]), fname)
@@ -0,0 +1,20 @@
+# The own-records rules now filter on owner_user_id and inspector_id instead
+# of joining hr.employee. Their records are noupdate: release them for this
+# update so they are reloaded from the data file, post-migrate locks them again.
+UPDATED_RULES = (
+    'insurance_claim_user_rule',
+    'incident_report_user_rule',
+    'office_inspection_user_rule',
+    'vehicle_inspection_user_rule',
+    'employee_suggestion_user_rule',
+)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    cr.execute("""
+        UPDATE ir_model_data
+           SET noupdate = false
+         WHERE module = 'insurance_module' AND model = 'ir.rule' AND name IN %s
+    """, (UPDATED_RULES,))
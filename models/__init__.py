@@ -1,12 +1,26 @@
+from . import ir_attachment
+from . import ir_sequence
+from . import insurance_sequence_mixin
+from . import insurance_aggregate_mixin
+from . import safety_evidence
 from . import res_config_settings
 from . import res_partner
 from . import office_inspection
 from . import incident_report
+from . import incident_analytics
+from . import root_cause_analysis
+from . import safety_location
 from . import fire_extinguisher
 from . import accident_investigation
 from . import vehicle_inspection
+from . import fleet_vehicle
 from . import insurance_claim
+from . import insurance_claim_ledger
+from . import insurance_bordereau
 from . import insurance_type
 from . import employee_suggestion
 from . import employee_safety_induction
-from . import welding_machine_inspection 
\ No newline at end of file
+from . import welding_machine_inspection
+from . import vehicle_telematics
+from . import legacy_import
+from . import insurance_report_job
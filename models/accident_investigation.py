@@ -5,7 +5,7 @@ from datetime import datetime
 class AccidentInvestigation(models.Model):
     _name = 'accident.investigation'
     _description = 'Accident Investigation'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'insurance.sequence.mixin', 'safety.evidence.mixin']
     _order = 'investigation_date desc'
 
     name = fields.Char(string='Reference', required=True, copy=False, readonly=True,
@@ -100,9 +100,7 @@ class AccidentInvestigation(models.Model):
     
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get('name', _('New')) == _('New'):
-                vals['name'] = self.env['ir.sequence'].next_by_code('accident.investigation') or _('New')
+        self._assign_sequence_names(vals_list)
         return super(AccidentInvestigation, self).create(vals_list)
     
     def action_start_investigation(self):
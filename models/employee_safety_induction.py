@@ -4,7 +4,7 @@ from odoo.exceptions import ValidationError
 class EmployeeSafetyInduction(models.Model):
     _name = 'employee.safety.induction'
     _description = 'Employee Safety Induction'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'insurance.sequence.mixin', 'safety.evidence.mixin']
 
     name = fields.Char(string='Reference', required=True, copy=False, 
                       readonly=True, default=lambda self: ('New'))
@@ -22,9 +22,7 @@ class EmployeeSafetyInduction(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get('name', 'New') == 'New':
-                vals['name'] = self.env['ir.sequence'].next_by_code('employee.safety.induction') or 'New'
+        self._assign_sequence_names(vals_list, 'New')
         return super().create(vals_list)
 
     def action_complete(self):
@@ -1,11 +1,12 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
 from datetime import datetime
 
 class EmployeeSuggestion(models.Model):
     _name = 'employee.suggestion'
     _description = 'Employee Safety Suggestion'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'insurance.sequence.mixin']
     _order = 'submission_date desc'
 
     name = fields.Char(string='Reference', required=True, copy=False, readonly=True,
@@ -14,6 +15,8 @@ class EmployeeSuggestion(models.Model):
                                 default=lambda self: self.env.company)
     employee_id = fields.Many2one('hr.employee', string='Employee',
                                 default=lambda self: self.env.user.employee_id)
+    owner_user_id = fields.Many2one('res.users', string='Owner', related='employee_id.user_id',
+                                    store=True, index='btree_not_null')
     department_id = fields.Many2one('hr.department', string='Department',
                                   related='employee_id.department_id', store=True)
     
@@ -75,11 +78,14 @@ class EmployeeSuggestion(models.Model):
     cost_estimate = fields.Float(string='Cost Estimate')
     implementation_time = fields.Integer(string='Implementation Time (days)')
     
+    def init(self):
+        # The own-records rule filters on the creator
+        create_index(self._cr, 'employee_suggestion_create_uid_index', self._table, ['create_uid'])
+
     @api.model_create_multi
     def create(self, vals_list):
+        self._assign_sequence_names(vals_list)
         for vals in vals_list:
-            if vals.get('name', _('New')) == _('New'):
-                vals['name'] = self.env['ir.sequence'].next_by_code('employee.suggestion') or _('New')
             if vals.get('anonymous', False):
                 vals['employee_id'] = False
         return super(EmployeeSuggestion, self).create(vals_list)
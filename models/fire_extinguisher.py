@@ -1,6 +1,17 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from collections import defaultdict
+from psycopg2 import IntegrityError
 from datetime import datetime, timedelta
+import logging
+import time
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+# Values accepted from devices for the boolean checks of an inspection round
+CHECK_TRUE_VALUES = {'1', 'true', 'yes', 'on'}
+CHECK_FALSE_VALUES = {'', '0', 'false', 'no', 'off'}
 
 class FireExtinguisher(models.Model):
     _name = 'fire.extinguisher'
@@ -12,6 +23,8 @@ class FireExtinguisher(models.Model):
     company_id = fields.Many2one('res.company', string='Company', required=True,
                                 default=lambda self: self.env.company)
     location = fields.Char(string='Location', tracking=True)
+    location_id = fields.Many2one('safety.location', string='Site Location', index='btree_not_null',
+                                  ondelete='restrict', tracking=True)
     category = fields.Selection([
         ('building', 'Building'),
         ('vehicle', 'Vehicle')
@@ -65,14 +78,100 @@ class FireExtinguisher(models.Model):
                record.expiry_date < record.manufacture_date:
                 raise ValidationError(_('Expiry date cannot be before manufacturing date.'))
     
-    @api.constrains('category', 'location', 'fleet_id')
+    @api.constrains('category', 'location', 'location_id', 'fleet_id')
     def _check_location_and_fleet(self):
         for rec in self:
-            if rec.category == 'building' and not rec.location:
+            if rec.category == 'building' and not (rec.location or rec.location_id):
                 raise ValidationError(_('Location is required when category is Building.'))
             if rec.category == 'vehicle' and not rec.fleet_id:
                 raise ValidationError(_('Fleet is required when category is Vehicle.'))
     
+    def init(self):
+        create_index(self._cr, 'fire_extinguisher_company_state_expiry_index', self._table,
+                     ['company_id', 'state', 'expiry_date'])
+        create_index(self._cr, 'fire_extinguisher_company_state_next_inspection_index', self._table,
+                     ['company_id', 'state', 'next_inspection_date'])
+
+    @api.model
+    def _cron_check_expiry_and_inspections(self, batch_size=1000):
+        """Expire the units past their expiry date and schedule an activity for
+        every overdue inspection, one set-based pass per company."""
+        start = time.monotonic()
+        today = fields.Date.context_today(self)
+        activity_type = self.env.ref('mail.mail_activity_data_todo', raise_if_not_found=False)
+        model_id = self.env['ir.model']._get_id(self._name)
+        self.flush_model()
+        expired_count = activity_count = 0
+        for company in self.env['res.company'].search([]):
+            self.env.cr.execute("""
+                UPDATE fire_extinguisher f
+                   SET state = 'expired', write_date = now() AT TIME ZONE 'UTC', write_uid = %s
+                  FROM fire_extinguisher old
+                 WHERE f.id = old.id AND f.company_id = %s
+                   AND f.state IN ('active', 'maintenance') AND f.expiry_date < %s
+             RETURNING f.location_id, old.state
+            """, (self.env.uid, company.id, today))
+            deltas = defaultdict(int)
+            for location_id, old_state in self.env.cr.fetchall():
+                deltas[location_id, old_state] -= 1
+                deltas[location_id, 'expired'] += 1
+                expired_count += 1
+            self.env['safety.location']._apply_extinguisher_deltas(deltas)
+            # Overdue units without an open inspection activity yet
+            self.env.cr.execute("""
+                SELECT f.id, f.create_uid
+                  FROM fire_extinguisher f
+                 WHERE f.company_id = %s AND f.state = 'active' AND f.next_inspection_date < %s
+                   AND NOT EXISTS (
+                        SELECT 1 FROM mail_activity a
+                         WHERE a.res_model = %s AND a.res_id = f.id
+                           AND a.activity_type_id IS NOT DISTINCT FROM %s)
+            """, (company.id, today, self._name, activity_type.id if activity_type else None))
+            overdue = self.env.cr.fetchall()
+            for index in range(0, len(overdue), batch_size):
+                self.env['mail.activity'].with_context(mail_activity_quick_update=True).create([{
+                    'res_model_id': model_id,
+                    'res_id': extinguisher_id,
+                    'activity_type_id': activity_type.id if activity_type else False,
+                    'summary': _('Fire extinguisher inspection overdue'),
+                    'date_deadline': today,
+                    'user_id': user_id or self.env.uid,
+                } for extinguisher_id, user_id in overdue[index:index + batch_size]])
+            activity_count += len(overdue)
+        self.invalidate_model(['state'])
+        _logger.info("Fire extinguisher check: %d units expired, %d inspection activities created in %.2fs",
+                     expired_count, activity_count, time.monotonic() - start)
+        return expired_count, activity_count
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(FireExtinguisher, self).create(vals_list)
+        records._update_location_counts(1)
+        return records
+
+    def write(self, vals):
+        if 'state' not in vals and 'location_id' not in vals:
+            return super(FireExtinguisher, self).write(vals)
+        self._update_location_counts(-1)
+        res = super(FireExtinguisher, self).write(vals)
+        self._update_location_counts(1)
+        return res
+
+    def unlink(self):
+        self._update_location_counts(-1)
+        return super(FireExtinguisher, self).unlink()
+
+    def _update_location_counts(self, sign):
+        deltas = defaultdict(int)
+        for record in self:
+            deltas[record.location_id.id, record.state] += sign
+        self.env['safety.location']._apply_extinguisher_deltas(deltas)
+
+    @api.onchange('location_id')
+    def _onchange_location_id(self):
+        if self.location_id:
+            self.location = self.location_id.complete_name
+
     def action_set_maintenance(self):
         self.write({'state': 'maintenance'})
     
@@ -127,12 +226,140 @@ class FireExtinguisherMaintenance(models.Model):
     
     notes = fields.Text(string='Maintenance Notes')
     next_maintenance_date = fields.Date(string='Next Maintenance Due')
+    client_key = fields.Char(string='Client Key', copy=False, readonly=True,
+                             help='Idempotency key set by the device that submitted the record')
+
+    _sql_constraints = [
+        ('client_key_uniq', 'unique(client_key)', 'This maintenance record has already been submitted.'),
+    ]
     
     @api.model_create_multi
     def create(self, vals_list):
         records = super(FireExtinguisherMaintenance, self).create(vals_list)
+        # Keep the most recent date per extinguisher, then write each date once
+        latest_dates = {}
         for record in records:
-            record.extinguisher_id.write({
-                'last_inspection_date': record.maintenance_date
+            extinguisher = record.extinguisher_id
+            latest = latest_dates.get(extinguisher, extinguisher.last_inspection_date)
+            if not latest or record.maintenance_date > latest:
+                latest_dates[extinguisher] = record.maintenance_date
+        extinguishers_by_date = {}
+        for extinguisher, maintenance_date in latest_dates.items():
+            extinguishers_by_date.setdefault(maintenance_date, self.env['fire.extinguisher'])
+            extinguishers_by_date[maintenance_date] |= extinguisher
+        for maintenance_date, extinguishers in extinguishers_by_date.items():
+            extinguishers.write({
+                'last_inspection_date': maintenance_date
+            })
+        return records 
+
+    @api.model
+    def _parse_check(self, value):
+        """Strictly parse a boolean check sent by a device; raise ValueError otherwise."""
+        if value is None or isinstance(value, bool):
+            return bool(value)
+        if isinstance(value, int) and value in (0, 1):
+            return bool(value)
+        if isinstance(value, str):
+            value = value.strip().lower()
+            if value in CHECK_TRUE_VALUES:
+                return True
+            if value in CHECK_FALSE_VALUES:
+                return False
+        raise ValueError(value)
+
+    @api.model
+    def _create_round_rows(self, vals_list, pending):
+        """Create the rows of a round, all at once when possible. If a concurrent
+        retry inserted one of the client keys first, every row is created under
+        its own savepoint and the rows it already holds are reported as duplicates."""
+        try:
+            with self.env.cr.savepoint():
+                records = self.create(vals_list)
+            for result, record in zip(pending, records):
+                result.update(status='created', id=record.id)
+            return
+        except IntegrityError:
+            pass
+        for vals, result in zip(vals_list, pending):
+            try:
+                with self.env.cr.savepoint():
+                    record = self.create(vals)
+                result.update(status='created', id=record.id)
+            except IntegrityError:
+                existing = self.sudo().search([('client_key', '=', vals['client_key'])], limit=1)
+                if existing:
+                    result.update(status='duplicate', id=existing.id)
+                else:
+                    result.update(status='error', error=_('The maintenance record could not be saved.'))
+
+    @api.model
+    def _submit_inspection_round(self, rows):
+        """Validate and create a round of maintenance rows submitted by a device.
+
+        Every row carries a ``client_key``; rows whose key already exists are
+        reported as duplicates instead of being created again. Returns one
+        result dict per row, in the order received.
+        """
+        rows = [row if isinstance(row, dict) else {} for row in rows]
+        results = [{'client_key': row.get('client_key') or False} for row in rows]
+        keys = [result['client_key'] for result in results if result['client_key']]
+        existing = {
+            record.client_key: record.id
+            for record in self.sudo().search([('client_key', 'in', keys)])
+        } if keys else {}
+        serials = [row['serial'] for row in rows if row.get('serial')]
+        extinguisher_by_serial = {
+            extinguisher.name: extinguisher.id
+            for extinguisher in self.env['fire.extinguisher'].search([('name', 'in', serials)])
+        } if serials else {}
+        extinguisher_ids = [row['extinguisher_id'] for row in rows if isinstance(row.get('extinguisher_id'), int)]
+        valid_extinguisher_ids = set(self.env['fire.extinguisher'].search([('id', 'in', extinguisher_ids)]).ids)
+        valid_extinguisher_ids.update(extinguisher_by_serial.values())
+        maintenance_types = dict(self._fields['maintenance_type'].selection)
+
+        vals_list, pending = [], []
+        seen = set()
+        for row, result in zip(rows, results):
+            key = result['client_key']
+            if not key:
+                result.update(status='error', error=_('Missing client key.'))
+                continue
+            if key in existing:
+                result.update(status='duplicate', id=existing[key])
+                continue
+            if key in seen:
+                result.update(status='error', error=_('Client key used twice in the same round.'))
+                continue
+            extinguisher_id = row.get('extinguisher_id') or extinguisher_by_serial.get(row.get('serial'))
+            if extinguisher_id not in valid_extinguisher_ids:
+                result.update(status='error', error=_('Unknown fire extinguisher.'))
+                continue
+            maintenance_type = row.get('maintenance_type') or 'inspection'
+            if maintenance_type not in maintenance_types:
+                result.update(status='error', error=_('Invalid maintenance type %s.', maintenance_type))
+                continue
+            try:
+                maintenance_date = fields.Date.to_date(row.get('maintenance_date')) or fields.Date.context_today(self)
+            except (ValueError, TypeError):
+                result.update(status='error', error=_('Invalid maintenance date.'))
+                continue
+            try:
+                checks = {fname: self._parse_check(row.get(fname))
+                          for fname in ('pressure_check', 'nozzle_check', 'seal_check', 'weight_check')}
+            except ValueError:
+                result.update(status='error', error=_('Invalid check value.'))
+                continue
+            seen.add(key)
+            vals_list.append({
+                'client_key': key,
+                'extinguisher_id': extinguisher_id,
+                'maintenance_date': maintenance_date,
+                'maintenance_type': maintenance_type,
+                **checks,
+                'notes': row.get('notes') or False,
             })
-        return records 
\ No newline at end of file
+            pending.append(result)
+        if vals_list:
+            self._create_round_rows(vals_list, pending)
+        return results
@@ -0,0 +1,150 @@
+import logging
+import time
+
+from odoo import models, fields, api, _
+
+from .vehicle_inspection import INSPECTION_INTERVAL_DAYS, MAINTENANCE_OPEN_STATES, MAINTENANCE_ROLLUP_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+
+class FleetVehicle(models.Model):
+    _inherit = 'fleet.vehicle'
+
+    # Inspection-due index, maintained by vehicle.inspection create/write/unlink
+    last_inspection_date = fields.Date(string='Last Inspection', readonly=True, index=True, copy=False)
+    next_inspection_due = fields.Date(string='Next Inspection Due', readonly=True, index=True, copy=False)
+    last_inspection_state = fields.Selection([
+        ('draft', 'Draft'),
+        ('in_progress', 'In Progress'),
+        ('done', 'Done'),
+        ('cancelled', 'Cancelled')
+    ], string='Last Inspection Status', readonly=True, copy=False)
+
+    # Maintenance cost rollups, maintained by vehicle.inspection.maintenance create/write/unlink
+    maintenance_open_count = fields.Integer(string='Open Maintenance Items', readonly=True, copy=False)
+    maintenance_critical_count = fields.Integer(string='Critical Maintenance Items', readonly=True, copy=False)
+    maintenance_open_cost = fields.Float(string='Estimated Open Maintenance Cost', readonly=True, copy=False)
+    maintenance_done_cost_ytd = fields.Float(string='Completed Maintenance Cost (YTD)', readonly=True, copy=False)
+
+    def _refresh_inspection_index(self):
+        """Recompute the inspection-due fields of these vehicles with a single statement.
+
+        The last inspection date is the latest completed inspection; the status is
+        the one of the latest inspection that was not cancelled.
+        """
+        if not self:
+            return
+        self.env['vehicle.inspection'].flush_model(['vehicle_id', 'inspection_date', 'state'])
+        self.env.cr.execute("""
+            UPDATE fleet_vehicle v
+               SET last_inspection_date = s.last_date,
+                   next_inspection_due = s.last_date + %s,
+                   last_inspection_state = s.last_state
+              FROM (
+                    SELECT v2.id,
+                           (SELECT max(i.inspection_date) FROM vehicle_inspection i
+                             WHERE i.vehicle_id = v2.id AND i.state = 'done') AS last_date,
+                           (SELECT i.state FROM vehicle_inspection i
+                             WHERE i.vehicle_id = v2.id AND i.state != 'cancelled'
+                          ORDER BY i.inspection_date DESC NULLS LAST, i.id DESC LIMIT 1) AS last_state
+                      FROM fleet_vehicle v2
+                     WHERE v2.id IN %s
+                   ) s
+             WHERE v.id = s.id
+        """, (INSPECTION_INTERVAL_DAYS, tuple(self.ids)))
+        self.invalidate_recordset(['last_inspection_date', 'next_inspection_due', 'last_inspection_state'])
+
+    @api.model
+    def _cron_inspection_due_reminders(self, days_ahead=7, batch_size=1000):
+        """Schedule an activity for every vehicle whose inspection is due soon or
+        overdue and has no open inspection activity yet."""
+        if not self.env['ir.config_parameter'].sudo().get_param('insurance_module.module_auto_inspection_reminder'):
+            return 0
+        start = time.monotonic()
+        today = fields.Date.context_today(self)
+        activity_type = self.env.ref('mail.mail_activity_data_todo', raise_if_not_found=False)
+        model_id = self.env['ir.model']._get_id(self._name)
+        self.flush_model(['next_inspection_due', 'manager_id'])
+        self.env.cr.execute("""
+            SELECT v.id, v.next_inspection_due, v.manager_id
+              FROM fleet_vehicle v
+             WHERE v.active AND v.next_inspection_due <= %s
+               AND NOT EXISTS (
+                    SELECT 1 FROM mail_activity a
+                     WHERE a.res_model = %s AND a.res_id = v.id
+                       AND a.activity_type_id IS NOT DISTINCT FROM %s)
+        """, (fields.Date.add(today, days=days_ahead), self._name, activity_type.id if activity_type else None))
+        due = self.env.cr.fetchall()
+        for index in range(0, len(due), batch_size):
+            self.env['mail.activity'].create([{
+                'res_model_id': model_id,
+                'res_id': vehicle_id,
+                'activity_type_id': activity_type.id if activity_type else False,
+                'summary': _('Vehicle inspection due'),
+                'date_deadline': due_date,
+                'user_id': manager_id or self.env.uid,
+            } for vehicle_id, due_date, manager_id in due[index:index + batch_size]])
+        _logger.info("Vehicle inspection reminders: %d activities created in %.2fs", len(due), time.monotonic() - start)
+        return len(due)
+
+    @api.model
+    def _apply_maintenance_deltas(self, deltas):
+        """Add ``deltas`` ({vehicle_id: [open, critical, open cost, completed cost]})
+        to the maintenance rollups with a single statement."""
+        deltas = {vehicle_id: delta for vehicle_id, delta in deltas.items() if vehicle_id and any(delta)}
+        if not deltas:
+            return
+        self.env.cr.execute("""
+            UPDATE fleet_vehicle v
+               SET maintenance_open_count = COALESCE(v.maintenance_open_count, 0) + d.open_count,
+                   maintenance_critical_count = COALESCE(v.maintenance_critical_count, 0) + d.critical_count,
+                   maintenance_open_cost = COALESCE(v.maintenance_open_cost, 0) + d.open_cost,
+                   maintenance_done_cost_ytd = COALESCE(v.maintenance_done_cost_ytd, 0) + d.done_cost
+              FROM (VALUES %s) AS d(id, open_count, critical_count, open_cost, done_cost)
+             WHERE v.id = d.id
+        """ % ', '.join(['(%s, %s, %s, %s::numeric, %s::numeric)'] * len(deltas)),
+            [value for vehicle_id, delta in deltas.items() for value in [vehicle_id] + delta])
+        self.browse(list(deltas)).invalidate_recordset([
+            'maintenance_open_count', 'maintenance_critical_count',
+            'maintenance_open_cost', 'maintenance_done_cost_ytd',
+        ])
+
+    @api.model
+    def _recompute_maintenance_rollups(self):
+        """Rebuild the maintenance rollups of every vehicle from scratch."""
+        self.env['vehicle.inspection.maintenance'].flush_model(list(MAINTENANCE_ROLLUP_FIELDS))
+        year_start = fields.Date.context_today(self).replace(month=1, day=1)
+        self.env.cr.execute("""
+            UPDATE fleet_vehicle v
+               SET maintenance_open_count = COALESCE(m.open_count, 0),
+                   maintenance_critical_count = COALESCE(m.critical_count, 0),
+                   maintenance_open_cost = COALESCE(m.open_cost, 0),
+                   maintenance_done_cost_ytd = COALESCE(m.done_cost, 0)
+              FROM fleet_vehicle v2
+         LEFT JOIN (
+                SELECT vehicle_id,
+                       count(*) FILTER (WHERE state IN %(open)s) AS open_count,
+                       count(*) FILTER (WHERE state IN %(open)s AND priority = '3') AS critical_count,
+                       sum(cost) FILTER (WHERE state IN %(open)s) AS open_cost,
+                       sum(cost) FILTER (WHERE state = 'done' AND completion_date >= %(year_start)s
+                                           AND completion_date < %(year_start)s + interval '1 year') AS done_cost
+                  FROM vehicle_inspection_maintenance
+              GROUP BY vehicle_id
+                   ) m ON m.vehicle_id = v2.id
+             WHERE v.id = v2.id
+        """, {'open': MAINTENANCE_OPEN_STATES, 'year_start': year_start})
+        self.env['ir.config_parameter'].sudo().set_param(
+            'insurance_module.maintenance_rollup_year', year_start.year)
+        self.invalidate_model([
+            'maintenance_open_count', 'maintenance_critical_count',
+            'maintenance_open_cost', 'maintenance_done_cost_ytd',
+        ])
+
+    @api.model
+    def _cron_maintenance_rollup_rollover(self):
+        """Restart the year-to-date costs when a new year begins; the incremental
+        updates keep the rollups exact the rest of the time."""
+        year = self.env['ir.config_parameter'].sudo().get_param('insurance_module.maintenance_rollup_year')
+        if year != str(fields.Date.context_today(self).year):
+            self._recompute_maintenance_rollups()
@@ -0,0 +1,142 @@
+import logging
+import time
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+
+class IncidentAnalytics(models.Model):
+    _name = 'incident.analytics'
+    _description = 'Incident Analytics'
+    _inherit = ['insurance.aggregate.mixin']
+    _auto = False
+    _order = 'month desc, company_id'
+    _rec_name = 'month'
+    _aggregate_group_columns = ('company_id', 'department_id', 'incident_type', 'state', 'month')
+    _aggregate_refresh_param = 'insurance_module.incident_analytics_last_refresh'
+    _aggregate_insert_query = """
+        INSERT INTO incident_analytics (company_id, department_id, incident_type, state, month,
+                                        incident_count, investigation_count,
+                                        missed_shift_count, claim_required_count)
+             SELECT s.company_id, s.department_id, s.incident_type, s.state, s.month,
+                    count(*),
+                    count(*) FILTER (WHERE s.requires_investigation),
+                    count(*) FILTER (WHERE s.miss_shift),
+                    count(*) FILTER (WHERE s.insurance_claim_required)
+               FROM incident_analytics_source s %s
+           GROUP BY s.company_id, s.department_id, s.incident_type, s.state, s.month
+    """
+
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    department_id = fields.Many2one('hr.department', string='Department', readonly=True)
+    incident_type = fields.Selection([
+        ('mva', 'MVA'),
+        ('pva', 'PVA'),
+        ('motor_cyclist', 'Motor/Cyclist')
+    ], string='Type of Incident', readonly=True)
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('reported', 'Reported'),
+        ('investigation', 'Under Investigation'),
+        ('action', 'Action Required'),
+        ('resolved', 'Resolved'),
+        ('closed', 'Closed')
+    ], string='Status', readonly=True)
+    month = fields.Date(string='Month', readonly=True)
+    incident_count = fields.Integer(string='Incidents', readonly=True)
+    investigation_count = fields.Integer(string='Requiring Investigation', readonly=True)
+    missed_shift_count = fields.Integer(string='Missed Shifts', readonly=True)
+    claim_required_count = fields.Integer(string='Insurance Claims Required', readonly=True)
+
+    def init(self):
+        # incident_analytics_source keeps the group of every incident as of the
+        # last refresh, so an incremental run knows which groups a change left.
+        self.env.cr.execute("""
+            CREATE TABLE IF NOT EXISTS incident_analytics_source (
+                incident_id integer PRIMARY KEY,
+                company_id integer,
+                department_id integer,
+                incident_type varchar,
+                state varchar,
+                month date,
+                requires_investigation boolean,
+                miss_shift boolean,
+                insurance_claim_required boolean
+            );
+            CREATE TABLE IF NOT EXISTS incident_analytics (
+                id serial PRIMARY KEY,
+                company_id integer,
+                department_id integer,
+                incident_type varchar,
+                state varchar,
+                month date,
+                incident_count integer,
+                investigation_count integer,
+                missed_shift_count integer,
+                claim_required_count integer
+            );
+            CREATE INDEX IF NOT EXISTS incident_analytics_group_index
+                ON incident_analytics (month, company_id, department_id, incident_type, state);
+        """)
+
+    @api.model
+    def _source_select(self, where=""):
+        return """
+            SELECT id, company_id, department_id, incident_type, state,
+                   date_trunc('month', incident_datetime)::date,
+                   requires_investigation, miss_shift, insurance_claim_required
+              FROM incident_report %s
+        """ % where
+
+    @api.model
+    def refresh(self, full=False):
+        """Refresh the aggregates, only reprocessing incidents written since the last run
+        unless ``full`` is set. Returns the number of incidents reprocessed."""
+        start = time.monotonic()
+        self.env['incident.report'].flush_model()
+        cr = self.env.cr
+        refresh_time, since = self._start_refresh()
+        if full or not since:
+            cr.execute("TRUNCATE incident_analytics, incident_analytics_source")
+            cr.execute("INSERT INTO incident_analytics_source " + self._source_select())
+            count = cr.rowcount
+            self._aggregate_groups()
+        else:
+            cr.execute("""
+                CREATE TEMP TABLE incident_analytics_changed ON COMMIT DROP AS
+                    SELECT id FROM incident_report WHERE write_date >= %s
+                     UNION
+                    SELECT s.incident_id FROM incident_analytics_source s
+                     WHERE NOT EXISTS (SELECT 1 FROM incident_report r WHERE r.id = s.incident_id)
+            """, (since,))
+            count = cr.rowcount
+            # Groups the changed incidents belonged to before and after the change
+            cr.execute("""
+                CREATE TEMP TABLE incident_analytics_affected ON COMMIT DROP AS
+                    SELECT DISTINCT company_id, department_id, incident_type, state, month
+                      FROM incident_analytics_source
+                     WHERE incident_id IN (SELECT id FROM incident_analytics_changed)
+                     UNION
+                    SELECT company_id, department_id, incident_type, state,
+                           date_trunc('month', incident_datetime)::date
+                      FROM incident_report
+                     WHERE id IN (SELECT id FROM incident_analytics_changed)
+            """)
+            cr.execute("DELETE FROM incident_analytics_source WHERE incident_id IN (SELECT id FROM incident_analytics_changed)")
+            cr.execute("INSERT INTO incident_analytics_source " + self._source_select(
+                "WHERE id IN (SELECT id FROM incident_analytics_changed)"))
+            self._aggregate_groups('incident_analytics_affected')
+            cr.execute("DROP TABLE incident_analytics_changed, incident_analytics_affected")
+        self._end_refresh(refresh_time)
+        _logger.info("Incident analytics refreshed: %d incidents reprocessed in %.2fs",
+                     count, time.monotonic() - start)
+        return count
+
+    @api.model
+    def _cron_refresh(self):
+        self.refresh()
+
+    @api.model
+    def action_full_refresh(self):
+        self.refresh(full=True)
@@ -1,7 +1,12 @@
 from odoo import models, fields, api, _
-from odoo.exceptions import ValidationError
-from datetime import datetime
+from odoo.exceptions import UserError, ValidationError
+from datetime import datetime, timedelta
+import logging
+import time
 from dateutil.relativedelta import relativedelta
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
 
 class IncidentInvestigator(models.Model):
     _name = 'incident.investigator'
@@ -23,14 +28,15 @@ class IncidentInvestigator(models.Model):
 class IncidentReport(models.Model):
     _name = 'incident.report'
     _description = 'Incident Report'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'insurance.sequence.mixin', 'safety.evidence.mixin']
     _order = 'incident_datetime desc, id desc'
 
     name = fields.Char(string='Reference', required=True, copy=False, readonly=True,
                       default=lambda self: _('New'))
     
     # Section 1 - Personal/Employment Details
-    employee_id = fields.Many2one('hr.employee', string='Employee', required=True)
+    employee_id = fields.Many2one('hr.employee', string='Employee', required=True, index=True)
+    owner_user_id = fields.Many2one('res.users', string='Owner', related='employee_id.user_id', store=True, index='btree_not_null')
     employee_id_number = fields.Char(string='Employee ID', readonly=True)
     department_id = fields.Many2one('hr.department', string='Department', related='employee_id.department_id', store=True, readonly=True)
     address = fields.Text(string='Address', readonly=True)
@@ -168,7 +174,7 @@ class IncidentReport(models.Model):
     miss_shift = fields.Boolean(string='Is it likely that person may miss one complete shift?')
     
     # Additional Fields
-    company_id = fields.Many2one('res.company', string='Company', required=True,
+    company_id = fields.Many2one('res.company', string='Company', required=True, index=True,
                                 default=lambda self: self.env.company)
     state = fields.Selection([
         ('draft', 'Draft'),
@@ -251,7 +257,7 @@ class IncidentReport(models.Model):
     preliminary_findings = fields.Text(string='Preliminary Findings')
 
     # Vehicle Details
-    vehicle_id = fields.Many2one('fleet.vehicle', string='Vehicle')
+    vehicle_id = fields.Many2one('fleet.vehicle', string='Vehicle', index='btree_not_null')
     vehicle_type = fields.Char(string='Vehicle Type', compute='_compute_vehicle_info', store=True)
     vehicle_ownership = fields.Selection([
         ('nt', 'NT'),
@@ -275,34 +281,68 @@ class IncidentReport(models.Model):
     product_handling = fields.Text(string='How was the product handled after the incident?')
     telematics_installed = fields.Boolean(string='Telematics/GPS Installed', compute='_compute_vehicle_info', store=True)
 
-    @api.depends('vehicle_id', 'vehicle_id.model_id', 'vehicle_id.model_id.brand_id', 'vehicle_id.odometer')
+    # Snapshot of the vehicle data taken when the incident is reported (opt-in)
+    vehicle_snapshot = fields.Json(string='Vehicle Snapshot', readonly=True, copy=False)
+    vehicle_snapshot_date = fields.Datetime(string='Vehicle Data Captured On', readonly=True, copy=False)
+    live_vehicle_id = fields.Many2one('fleet.vehicle', string='Live Vehicle',
+                                      compute='_compute_live_vehicle_id', store=True)
+
+    @api.depends('vehicle_id', 'vehicle_snapshot_date')
+    def _compute_live_vehicle_id(self):
+        # Snapshotted incidents drop out of the live dependency chain, so fleet
+        # updates no longer fan out into writes on them.
+        for record in self:
+            record.live_vehicle_id = False if record.vehicle_snapshot_date else record.vehicle_id
+
+    @api.model
+    def _get_vehicle_info_values(self, vehicle):
+        brand_name = vehicle.model_id.brand_id.name or ''
+        return {
+            'vehicle_type': brand_name,
+            'vehicle_make': brand_name,
+            'vehicle_model': vehicle.model_id.name or '',
+            'odometer_reading': vehicle.odometer or 0.0,
+            'service_records_available': bool(vehicle.service_count),
+            'telematics_installed': vehicle.telematics_installed if 'telematics_installed' in vehicle._fields else False,
+        }
+
+    @api.depends('live_vehicle_id', 'live_vehicle_id.model_id', 'live_vehicle_id.model_id.brand_id',
+                 'live_vehicle_id.odometer', 'vehicle_snapshot')
     def _compute_vehicle_info(self):
         for record in self:
-            if record.vehicle_id:
-                record.vehicle_type = record.vehicle_id.model_id.brand_id.name if record.vehicle_id.model_id.brand_id else ''
-                record.vehicle_make = record.vehicle_id.model_id.brand_id.name if record.vehicle_id.model_id.brand_id else ''
-                record.vehicle_model = record.vehicle_id.model_id.name if record.vehicle_id.model_id else ''
-                record.odometer_reading = record.vehicle_id.odometer or 0.0
-                record.service_records_available = bool(record.vehicle_id.service_count)
-                record.telematics_installed = record.vehicle_id.telematics_installed if hasattr(record.vehicle_id, 'telematics_installed') else False
+            if record.vehicle_snapshot_date:
+                record.update(record.vehicle_snapshot or self._get_vehicle_info_values(self.env['fleet.vehicle']))
             else:
-                record.vehicle_type = ''
-                record.vehicle_make = ''
-                record.vehicle_model = ''
-                record.odometer_reading = 0.0
-                record.service_records_available = False
-                record.telematics_installed = False
+                record.update(self._get_vehicle_info_values(record.live_vehicle_id))
+
+    @api.model
+    def _is_vehicle_snapshot_enabled(self):
+        return bool(self.env['ir.config_parameter'].sudo().get_param('insurance_module.incident_vehicle_snapshot'))
+
+    def _snapshot_vehicle_info(self):
+        """Freeze the vehicle data of the incidents at their current values."""
+        now = fields.Datetime.now()
+        for vehicle, records in self.grouped('vehicle_id').items():
+            records.write({
+                'vehicle_snapshot': self._get_vehicle_info_values(vehicle),
+                'vehicle_snapshot_date': now,
+            })
 
     @api.depends('vehicle_id')
     def _compute_last_service_date(self):
+        # One grouped query for the whole recordset instead of a search per record
+        last_dates = {}
+        if self.vehicle_id:
+            last_dates = {
+                vehicle.id: last_date
+                for vehicle, last_date in self.env['fleet.vehicle.log.services']._read_group(
+                    [('vehicle_id', 'in', self.vehicle_id.ids)],
+                    groupby=['vehicle_id'],
+                    aggregates=['date:max'],
+                )
+            }
         for record in self:
-            if record.vehicle_id:
-                last_service = self.env['fleet.vehicle.log.services'].search([
-                    ('vehicle_id', '=', record.vehicle_id.id)
-                ], order='date desc', limit=1)
-                record.last_service_date = last_service.date if last_service else False
-            else:
-                record.last_service_date = False
+            record.last_service_date = last_dates.get(record.vehicle_id.id, False)
 
     # Telematics/GPS Data
     telematics_start_time = fields.Datetime(string='Start time (Day of Incident)')
@@ -316,8 +356,21 @@ class IncidentReport(models.Model):
     harsh_braking = fields.Integer(string='Harsh Braking for day')
     driver_history = fields.Text(string='Driver History (30 Days)')
 
+    def action_compute_telematics(self):
+        """Derive the telematics figures from the samples recorded between the start and end times."""
+        speed_limit = float(self.env['ir.config_parameter'].sudo().get_param(
+            'insurance_module.telematics_speed_limit', default=80))
+        samples = self.env['vehicle.telematics.sample']
+        for record in self:
+            if not (record.vehicle_id and record.telematics_start_time and record.telematics_end_time):
+                raise UserError(_('Set the vehicle and the telematics start and end times of %s first.', record.name))
+            series = samples._get_series(record.vehicle_id, record.telematics_start_time, record.telematics_end_time)
+            if series is None:
+                raise UserError(_('No telematics samples were recorded for %s in this period.', record.vehicle_id.display_name))
+            record.write(dict(samples._aggregate_series(series, speed_limit), source_telematics=True))
+
     # Driver Details
-    driver_id = fields.Many2one('hr.employee', string='Driver', required=True)
+    driver_id = fields.Many2one('hr.employee', string='Driver', required=True, index=True)
     driver_name = fields.Char(string='Full Name', compute='_compute_driver_info', store=True)
     driver_age = fields.Integer(string='Age', compute='_compute_driver_info', store=True)
     driver_gender = fields.Selection([
@@ -355,6 +408,17 @@ class IncidentReport(models.Model):
     maintenance_manager_signature = fields.Binary(string='E & Maintenance Department Manager Signature')
     maintenance_manager_date = fields.Date(string='E & Maintenance Department Manager Date')
 
+    def init(self):
+        # Access paths of the default list order, the company/state kanban and
+        # filters, and the open incidents worked on by the safety desk
+        create_index(self._cr, 'incident_report_datetime_id_index', self._table,
+                     ['incident_datetime DESC', 'id DESC'])
+        create_index(self._cr, 'incident_report_company_state_datetime_index', self._table,
+                     ['company_id', 'state', 'incident_datetime DESC'])
+        create_index(self._cr, 'incident_report_open_state_index', self._table,
+                     ['state', 'incident_datetime DESC'], where="state NOT IN ('resolved', 'closed')")
+        create_index(self._cr, 'incident_report_create_uid_index', self._table, ['create_uid'])
+
     @api.depends('incident_type')
     def _compute_requires_investigation(self):
         for record in self:
@@ -362,9 +426,8 @@ class IncidentReport(models.Model):
     
     @api.model_create_multi
     def create(self, vals_list):
+        self._assign_sequence_names(vals_list)
         for vals in vals_list:
-            if vals.get('name', _('New')) == _('New'):
-                vals['name'] = self.env['ir.sequence'].next_by_code('incident.report') or _('New')
             # Set default values for required fields if not provided
             if 'description' not in vals:
                 vals['description'] = 'To be filled'
@@ -372,16 +435,31 @@ class IncidentReport(models.Model):
                 vals['location'] = 'Not Specified'
         return super(IncidentReport, self).create(vals_list)
     
+    def write(self, vals):
+        res = super(IncidentReport, self).write(vals)
+        if 'vehicle_id' in vals:
+            self.filtered('vehicle_snapshot_date')._snapshot_vehicle_info()
+        return res
+
     def action_report(self):
-        self.write({'state': 'reported'})
-        if self.requires_investigation:
-            self.write({'state': 'investigation'})
-            # Create investigation record
-            self.env['accident.investigation'].create({
-                'incident_id': self.id,
-                'name': f'Investigation for {self.name}',
-                'investigation_date': fields.Date.today(),
-            })
+        not_draft = self.filtered(lambda r: r.state != 'draft')
+        if not_draft:
+            raise UserError(_('Only draft incidents can be reported: %s', ', '.join(not_draft.mapped('name'))))
+        if self._is_vehicle_snapshot_enabled():
+            self._snapshot_vehicle_info()
+        to_investigate = self.filtered('requires_investigation')
+        (self - to_investigate).write({'state': 'reported'})
+        to_investigate.write({'state': 'investigation'})
+        # Create investigation records in a single batch, their references
+        # reserved as one sequence block
+        if to_investigate:
+            investigation_date = fields.Date.today()
+            self.env['accident.investigation'].create([{
+                'incident_id': incident.id,
+                'investigation_date': investigation_date,
+                # Link the incident evidence instead of uploading it again
+                'evidence_ids': [(6, 0, incident.evidence_ids.ids)],
+            } for incident in to_investigate])
     
     def action_start_investigation(self):
         self.write({'state': 'investigation'})
@@ -426,4 +504,35 @@ class IncidentReport(models.Model):
             else:
                 record.driver_name = ''
                 record.driver_age = 0
-                record.driver_gender = False 
\ No newline at end of file
+                record.driver_gender = False 
+
+    @api.model
+    def _cron_refresh_driver_age(self):
+        """Nightly refresh of ``driver_age`` for the drivers whose birthday fell since the last run."""
+        start = time.monotonic()
+        params = self.env['ir.config_parameter'].sudo()
+        today = fields.Date.context_today(self)
+        last_run = fields.Date.to_date(params.get_param('insurance_module.driver_age_last_run')) or today - timedelta(days=1)
+        days = [last_run + timedelta(days=offset) for offset in range(1, min((today - last_run).days, 366) + 1)]
+        birthdays = {(day.month, day.day) for day in days}
+        if (3, 1) in birthdays:
+            # Leap-day birthdays only roll over on March 1st in common years
+            birthdays.add((2, 29))
+        count = 0
+        if birthdays:
+            self.env['hr.employee'].flush_model(['birthday'])
+            self.flush_model(['driver_id', 'driver_age'])
+            self.env.cr.execute("""
+                UPDATE incident_report r
+                   SET driver_age = date_part('year', age(%s, e.birthday))
+                  FROM hr_employee e
+                 WHERE r.driver_id = e.id
+                   AND e.birthday IS NOT NULL
+                   AND (date_part('month', e.birthday)::int, date_part('day', e.birthday)::int) IN %s
+                   AND r.driver_age IS DISTINCT FROM date_part('year', age(%s, e.birthday))
+            """, (today, tuple(birthdays), today))
+            count = self.env.cr.rowcount
+            self.invalidate_model(['driver_age'])
+        params.set_param('insurance_module.driver_age_last_run', fields.Date.to_string(today))
+        _logger.info("Driver age refresh: %d incidents updated in %.2fs", count, time.monotonic() - start)
+        return count
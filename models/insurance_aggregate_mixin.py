@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+# write_date is the start time of the writing transaction, which may commit
+# after a refresh that started later: incremental refreshes reprocess the
+# records written during this window before the previous run as well.
+REFRESH_OVERLAP = timedelta(hours=1)
+
+
+class InsuranceAggregateMixin(models.AbstractModel):
+    _name = 'insurance.aggregate.mixin'
+    _description = 'Incrementally Refreshed Aggregates'
+
+    # Columns identifying one aggregated row, shared by the source and aggregate tables
+    _aggregate_group_columns = ()
+    # Config parameter holding the start time of the last refresh
+    _aggregate_refresh_param = None
+    # Statement inserting the aggregate rows from the source table aliased
+    # ``s``, with a ``%s`` placeholder for the join limiting it to the affected
+    # groups; required on every model using the mixin
+    _aggregate_insert_query = None
+
+    def _setup_base(self):
+        super()._setup_base()
+        if not self._abstract and not (self._aggregate_insert_query and self._aggregate_group_columns
+                                       and self._aggregate_refresh_param):
+            raise TypeError("%s must define _aggregate_insert_query, _aggregate_group_columns "
+                            "and _aggregate_refresh_param" % self._name)
+
+    @api.model
+    def _aggregate_groups(self, affected_table=None):
+        """(Re)build the aggregate rows, optionally limited to the groups listed in ``affected_table``."""
+        join = ""
+        if affected_table:
+            join = "JOIN %s k ON %s" % (affected_table, " AND ".join(
+                "s.%s IS NOT DISTINCT FROM k.%s" % (column, column) for column in self._aggregate_group_columns))
+            self.env.cr.execute("DELETE FROM %s a USING %s k WHERE %s" % (
+                self._table, affected_table, " AND ".join(
+                    "a.%s IS NOT DISTINCT FROM k.%s" % (column, column) for column in self._aggregate_group_columns)))
+        self.env.cr.execute(self._aggregate_insert_query % join)
+
+    @api.model
+    def _start_refresh(self):
+        """Return the start time of this refresh and the write date from which
+        the source records must be reprocessed, or None for a full refresh."""
+        self.env.cr.execute("SELECT (now() AT TIME ZONE 'UTC')")
+        refresh_time = self.env.cr.fetchone()[0]
+        last_refresh = self.env['ir.config_parameter'].sudo().get_param(self._aggregate_refresh_param)
+        since = fields.Datetime.to_datetime(last_refresh) - REFRESH_OVERLAP if last_refresh else None
+        return refresh_time, since
+
+    @api.model
+    def _end_refresh(self, refresh_time):
+        self.env['ir.config_parameter'].sudo().set_param(
+            self._aggregate_refresh_param, fields.Datetime.to_string(refresh_time))
+        self.env.invalidate_all()
@@ -0,0 +1,157 @@
+import csv
+import io
+import logging
+import tempfile
+import time
+
+import xlsxwriter
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError, ValidationError
+
+_logger = logging.getLogger(__name__)
+
+# Bordereau columns: (header, value of a claim given the state labels)
+BORDEREAU_COLUMNS = [
+    ('Claim Reference', lambda claim, states: claim.name),
+    ('Claim Date', lambda claim, states: fields.Date.to_string(claim.claim_date)),
+    ('Incident', lambda claim, states: claim.incident_id.name or ''),
+    ('Employee', lambda claim, states: claim.employee_id.name or ''),
+    ('Department', lambda claim, states: claim.department_id.name or ''),
+    ('Insurance Type', lambda claim, states: claim.insurance_type_id.name or ''),
+    ('Amount', lambda claim, states: claim.amount),
+    ('Currency', lambda claim, states: claim.currency_id.name or ''),
+    ('Status', lambda claim, states: states.get(claim.state, '')),
+]
+
+
+class InsuranceBordereauExport(models.TransientModel):
+    _name = 'insurance.bordereau.export'
+    _description = 'Insurance Claims Bordereau Export'
+
+    insurer_id = fields.Many2one('res.partner', string='Insurance Company', required=True,
+                                 domain="[('is_company', '=', True)]")
+    date_from = fields.Date(string='From', required=True,
+                            default=lambda self: fields.Date.context_today(self).replace(day=1) - relativedelta(months=1))
+    date_to = fields.Date(string='To', required=True,
+                          default=lambda self: fields.Date.context_today(self).replace(day=1) - relativedelta(days=1))
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel (XLSX)'),
+    ], string='File Format', required=True, default='xlsx')
+    chunk_size = fields.Integer(string='Chunk Size', default=2000, required=True)
+    attachment_id = fields.Many2one('ir.attachment', string='Bordereau', readonly=True)
+
+    @api.constrains('chunk_size')
+    def _check_chunk_size(self):
+        for record in self:
+            if record.chunk_size <= 0:
+                raise ValidationError(_('The chunk size must be positive.'))
+
+    def _get_claim_domain(self):
+        self.ensure_one()
+        return [
+            ('insurance_company_id', '=', self.insurer_id.id),
+            ('claim_date', '>=', self.date_from),
+            ('claim_date', '<=', self.date_to),
+        ]
+
+    def _get_file_name(self):
+        self.ensure_one()
+        return 'Bordereau %s %s-%s.%s' % (
+            self.insurer_id.name, fields.Date.to_string(self.date_from),
+            fields.Date.to_string(self.date_to), self.file_format)
+
+    def _iter_claims(self):
+        """Yield the claims of the bordereau one chunk at a time, paginating on the id
+        so every chunk is an index range scan whatever the export size."""
+        self.ensure_one()
+        domain, chunk_size = self._get_claim_domain(), self.chunk_size
+        Claim = self.env['insurance.claim']
+        last_id = 0
+        while True:
+            claims = Claim.search(domain + [('id', '>', last_id)], order='id', limit=chunk_size)
+            if not claims:
+                break
+            claims.fetch(['name', 'claim_date', 'incident_id', 'employee_id', 'department_id',
+                          'insurance_type_id', 'amount', 'currency_id', 'state'])
+            # One query per relation for the whole chunk
+            claims.incident_id.fetch(['name'])
+            claims.employee_id.fetch(['name'])
+            claims.department_id.fetch(['name'])
+            claims.insurance_type_id.fetch(['name'])
+            claims.currency_id.fetch(['name'])
+            last_id = claims[-1].id
+            yield claims
+            # Drop the exported chunk and its relations from the cache to keep memory constant
+            self.env.invalidate_all()
+
+    def _iter_rows(self):
+        states = dict(self.env['insurance.claim']._fields['state']._description_selection(self.env))
+        for claims in self._iter_claims():
+            for claim in claims:
+                yield [value(claim, states) for _header, value in BORDEREAU_COLUMNS]
+
+    def _write_csv(self, fileobj):
+        text = io.TextIOWrapper(fileobj, encoding='utf-8', newline='')
+        writer = csv.writer(text)
+        writer.writerow([header for header, _value in BORDEREAU_COLUMNS])
+        writer.writerows(self._iter_rows())
+        text.flush()
+        text.detach()
+
+    def _write_xlsx(self, fileobj):
+        # constant_memory flushes every row to disk as soon as the next one starts
+        workbook = xlsxwriter.Workbook(fileobj, {'constant_memory': True})
+        sheet = workbook.add_worksheet(_('Bordereau'))
+        bold = workbook.add_format({'bold': True})
+        sheet.write_row(0, 0, [header for header, _value in BORDEREAU_COLUMNS], bold)
+        for row_index, row in enumerate(self._iter_rows(), start=1):
+            sheet.write_row(row_index, 0, row)
+        workbook.close()
+
+    def _write_file(self, fileobj):
+        """Write the bordereau to the binary file object ``fileobj``, chunk by chunk."""
+        self.ensure_one()
+        start = time.monotonic()
+        if self.file_format == 'csv':
+            self._write_csv(fileobj)
+        else:
+            self._write_xlsx(fileobj)
+        fileobj.seek(0)
+        _logger.info("Bordereau for %s exported in %.2fs", self.insurer_id.display_name, time.monotonic() - start)
+
+    def _get_mimetype(self):
+        if self.file_format == 'csv':
+            return 'text/csv'
+        return 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+    def action_attach(self):
+        """Generate the bordereau and attach it to the insurance company."""
+        self.ensure_one()
+        if not self.env['insurance.claim'].search_count(self._get_claim_domain(), limit=1):
+            raise UserError(_('There are no claims for this insurance company in the selected period.'))
+        with tempfile.TemporaryFile() as fileobj:
+            self._write_file(fileobj)
+            self.attachment_id = self.env['ir.attachment']._create_from_file({
+                'name': self._get_file_name(),
+                'res_model': 'res.partner',
+                'res_id': self.insurer_id.id,
+                'mimetype': self._get_mimetype(),
+            }, fileobj)
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_download(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/insurance_module/bordereau/%s' % self.id,
+            'target': 'self',
+        }
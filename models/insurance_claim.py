@@ -1,5 +1,28 @@
+import hashlib
+import logging
+import time
+
+from markupsafe import Markup
+
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+# Claim states each target state can be reached from
+CLAIM_TRANSITIONS = {
+    'submitted': ('draft',),
+    'approved': ('submitted',),
+    'rejected': ('submitted',),
+    'processed': ('approved',),
+    'draft': ('rejected',),
+}
+# Two claims sharing a fingerprint are possible duplicates when their dates are
+# at most this many days apart and their amounts differ by at most this ratio
+DUPLICATE_WINDOW_DAYS = 30
+DUPLICATE_AMOUNT_TOLERANCE = 0.1
+DUPLICATE_SCORING_FIELDS = {'incident_id', 'employee_id', 'claim_date', 'amount', 'state'}
 
 class InsuranceType(models.Model):
     _name = 'insurance.type'
@@ -19,7 +42,7 @@ class InsuranceType(models.Model):
 class InsuranceClaim(models.Model):
     _name = 'insurance.claim'
     _description = 'Insurance Claim'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'insurance.sequence.mixin', 'safety.evidence.mixin']
     _order = 'claim_date desc, id desc'
 
     name = fields.Char('Claim Reference', required=True, copy=False, readonly=True,
@@ -37,6 +60,8 @@ class InsuranceClaim(models.Model):
     
     employee_id = fields.Many2one('hr.employee', string='Employee',
                                  required=True, tracking=True)
+    owner_user_id = fields.Many2one('res.users', string='Owner', related='employee_id.user_id',
+                                    store=True, index='btree_not_null')
     department_id = fields.Many2one('hr.department', string='Department',
                                    related='employee_id.department_id', store=True)
     company_id = fields.Many2one('res.company', string='Company',
@@ -62,27 +87,170 @@ class InsuranceClaim(models.Model):
         help='Select the insurance company handling this claim.'
     )
 
+    fingerprint = fields.Char(string='Fingerprint', compute='_compute_fingerprint', store=True,
+                              index=True, copy=False)
+    possible_duplicate = fields.Boolean(string='Possible Duplicate', readonly=True, copy=False,
+                                        index=True)
+    duplicate_claim_ids = fields.Many2many('insurance.claim', string='Possible Duplicates',
+                                           compute='_compute_duplicate_claim_ids')
+
+    def init(self):
+        # Bordereau exports read the claims of one insurer over a date range,
+        # paginated on the id
+        create_index(self._cr, 'insurance_claim_insurer_date_id_index', self._table,
+                     ['insurance_company_id', 'claim_date', 'id'])
+        # The own-records rule filters on the creator
+        create_index(self._cr, 'insurance_claim_create_uid_index', self._table, ['create_uid'])
+
+    @api.depends('incident_id', 'employee_id')
+    def _compute_fingerprint(self):
+        for record in self:
+            if record.incident_id and record.employee_id:
+                record.fingerprint = hashlib.md5(
+                    ('%s-%s' % (record.incident_id.id, record.employee_id.id)).encode()).hexdigest()
+            else:
+                record.fingerprint = False
+
+    @api.model
+    def _is_duplicate_pair(self, claim, other):
+        if claim.id == other.id or 'rejected' in (claim.state, other.state):
+            return False
+        if claim.claim_date and other.claim_date \
+                and abs((claim.claim_date - other.claim_date).days) > DUPLICATE_WINDOW_DAYS:
+            return False
+        amount, other_amount = abs(claim.amount or 0.0), abs(other.amount or 0.0)
+        return abs(amount - other_amount) <= DUPLICATE_AMOUNT_TOLERANCE * max(amount, other_amount)
+
+    def _get_fingerprint_groups(self, fingerprints):
+        """Return {fingerprint: claims} for ``fingerprints``, read through the fingerprint index."""
+        groups = {}
+        for claim in self.search([('fingerprint', 'in', list(fingerprints))]):
+            groups.setdefault(claim.fingerprint, self.browse())
+            groups[claim.fingerprint] |= claim
+        return groups
+
+    def _compute_duplicate_claim_ids(self):
+        groups = self._get_fingerprint_groups(set(self.mapped('fingerprint')) - {False})
+        for record in self:
+            record.duplicate_claim_ids = groups.get(record.fingerprint, self.browse()).filtered(
+                lambda other: self._is_duplicate_pair(record, other))
+
+    @api.model
+    def _score_fingerprints(self, fingerprints):
+        """Re-flag the claims sharing one of ``fingerprints``; only these few
+        claims are compared, so the cost does not grow with the claim history."""
+        fingerprints = set(fingerprints) - {False, None}
+        if not fingerprints:
+            return
+        self.flush_model(['fingerprint', 'claim_date', 'amount', 'state'])
+        flagged, cleared = [], []
+        # Claims the current user cannot read still count as duplicates
+        for claims in self.sudo()._get_fingerprint_groups(fingerprints).values():
+            for claim in claims:
+                duplicate = any(self._is_duplicate_pair(claim, other) for other in claims)
+                if duplicate != claim.possible_duplicate:
+                    (flagged if duplicate else cleared).append(claim.id)
+        for value, ids in ((True, flagged), (False, cleared)):
+            if ids:
+                self.env.cr.execute("UPDATE insurance_claim SET possible_duplicate = %s WHERE id IN %s",
+                                    (value, tuple(ids)))
+        self.browse(flagged + cleared).invalidate_recordset(['possible_duplicate'])
+
+    @api.model
+    def _rescore_duplicates(self):
+        """Re-flag the whole claim history with a single set-based statement,
+        only writing the claims whose flag changes."""
+        self.flush_model(['fingerprint', 'claim_date', 'amount', 'state'])
+        self.env.cr.execute("""
+            WITH scored AS (
+                SELECT c.id, EXISTS (
+                        SELECT 1 FROM insurance_claim o
+                         WHERE o.fingerprint = c.fingerprint AND o.id != c.id
+                           AND o.state != 'rejected' AND c.state != 'rejected'
+                           AND (o.claim_date IS NULL OR c.claim_date IS NULL
+                                OR abs(o.claim_date - c.claim_date) <= %(window)s)
+                           AND abs(abs(COALESCE(o.amount, 0)) - abs(COALESCE(c.amount, 0)))
+                               <= %(tolerance)s * greatest(abs(COALESCE(o.amount, 0)), abs(COALESCE(c.amount, 0)))
+                       ) AS duplicate
+                  FROM insurance_claim c
+                 WHERE c.fingerprint IS NOT NULL OR c.possible_duplicate
+            )
+            UPDATE insurance_claim c
+               SET possible_duplicate = s.duplicate
+              FROM scored s
+             WHERE c.id = s.id AND c.possible_duplicate IS DISTINCT FROM s.duplicate
+        """, {'window': DUPLICATE_WINDOW_DAYS, 'tolerance': DUPLICATE_AMOUNT_TOLERANCE})
+        count = self.env.cr.rowcount
+        self.invalidate_model(['possible_duplicate'])
+        _logger.info("Insurance claim duplicates re-scored: %d claims changed", count)
+        return count
+
+    @api.model
+    def _cron_rescore_duplicates(self):
+        self._rescore_duplicates()
+
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get('name', _('New')) == _('New'):
-                vals['name'] = self.env['ir.sequence'].next_by_code('insurance.claim') or _('New')
-        return super().create(vals_list)
+        self._assign_sequence_names(vals_list)
+        records = super().create(vals_list)
+        self._score_fingerprints(records.mapped('fingerprint'))
+        return records
+
+    def write(self, vals):
+        if not DUPLICATE_SCORING_FIELDS & vals.keys():
+            return super().write(vals)
+        # Claims that matched the old fingerprints may not be duplicates anymore
+        fingerprints = set(self.mapped('fingerprint'))
+        res = super().write(vals)
+        self._score_fingerprints(fingerprints | set(self.mapped('fingerprint')))
+        return res
+
+    def unlink(self):
+        fingerprints = set(self.mapped('fingerprint'))
+        res = super().unlink()
+        self._score_fingerprints(fingerprints)
+        return res
+
+    def _transition(self, state):
+        """Move the whole set to ``state`` with a single write, after checking
+        every claim is in an allowed source state, and log one audit message
+        per claim instead of the per-field tracking."""
+        labels = dict(self._fields['state']._description_selection(self.env))
+        invalid = self.filtered(lambda c: c.state not in CLAIM_TRANSITIONS[state])
+        if invalid:
+            raise UserError(_('The following claims cannot be moved to %(state)s:\n%(claims)s',
+                              state=labels[state],
+                              claims='\n'.join(invalid[:20].mapped('name'))
+                              + ('\n...' if len(invalid) > 20 else '')))
+        if not self:
+            return True
+        start = time.monotonic()
+        previous = {claim.id: claim.state for claim in self}
+        self.with_context(tracking_disable=True).write({'state': state})
+        self._message_log_batch(bodies={
+            claim_id: Markup('<p>%s</p>') % _('Status: %(old)s → %(new)s',
+                                              old=labels.get(old_state, '-'), new=labels[state])
+            for claim_id, old_state in previous.items()
+        })
+        elapsed = time.monotonic() - start
+        _logger.info("Insurance claims moved to %s: %d claims in %.2fs (%.0f claims/s)",
+                     state, len(self), elapsed, len(self) / elapsed if elapsed else 0.0)
+        return True
 
     def action_submit(self):
-        self.write({'state': 'submitted'})
+        return self._transition('submitted')
 
     def action_approve(self):
-        self.write({'state': 'approved'})
+        return self._transition('approved')
 
     def action_process(self):
-        self.write({'state': 'processed'})
+        return self._transition('processed')
 
     def action_reject(self):
-        self.write({'state': 'rejected'})
+        return self._transition('rejected')
 
     def action_reset_to_draft(self):
-        self.write({'state': 'draft'})
+        return self._transition('draft')
 
     @api.constrains('amount')
     def _check_amount(self):
@@ -0,0 +1,205 @@
+import bisect
+import logging
+import time
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+
+class InsuranceClaimLedger(models.Model):
+    _name = 'insurance.claim.ledger'
+    _description = 'Insurance Claims Ledger'
+    _inherit = ['insurance.aggregate.mixin']
+    _auto = False
+    _order = 'month desc, company_id'
+    _rec_name = 'month'
+    _aggregate_group_columns = ('company_id', 'insurer_id', 'insurance_type_id', 'state', 'month')
+    _aggregate_refresh_param = 'insurance_module.claim_ledger_last_refresh'
+    _aggregate_insert_query = """
+        INSERT INTO insurance_claim_ledger (company_id, currency_id, insurer_id, insurance_type_id,
+                                            state, month, claim_count, amount_total)
+             SELECT s.company_id, c.currency_id, s.insurer_id, s.insurance_type_id, s.state, s.month,
+                    count(*), sum(s.amount)
+               FROM insurance_claim_ledger_source s
+          LEFT JOIN res_company c ON c.id = s.company_id %s
+           GROUP BY s.company_id, c.currency_id, s.insurer_id, s.insurance_type_id, s.state, s.month
+    """
+
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    currency_id = fields.Many2one('res.currency', string='Currency', readonly=True)
+    insurer_id = fields.Many2one('res.partner', string='Insurance Company', readonly=True)
+    insurance_type_id = fields.Many2one('insurance.type', string='Insurance Type', readonly=True)
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('submitted', 'Submitted'),
+        ('approved', 'Approved'),
+        ('processed', 'Processed'),
+        ('rejected', 'Rejected')
+    ], string='Status', readonly=True)
+    month = fields.Date(string='Month', readonly=True)
+    claim_count = fields.Integer(string='Claims', readonly=True)
+    amount_total = fields.Monetary(string='Claimed Amount', readonly=True)
+
+    def init(self):
+        # insurance_claim_ledger_source keeps the group and converted amount of
+        # every claim as of the last refresh, so an incremental run knows which
+        # groups a change left.
+        self.env.cr.execute("""
+            CREATE TABLE IF NOT EXISTS insurance_claim_ledger_source (
+                claim_id integer PRIMARY KEY,
+                company_id integer,
+                insurer_id integer,
+                insurance_type_id integer,
+                state varchar,
+                month date,
+                amount numeric
+            );
+            CREATE TABLE IF NOT EXISTS insurance_claim_ledger (
+                id serial PRIMARY KEY,
+                company_id integer,
+                currency_id integer,
+                insurer_id integer,
+                insurance_type_id integer,
+                state varchar,
+                month date,
+                claim_count integer,
+                amount_total numeric
+            );
+            CREATE INDEX IF NOT EXISTS insurance_claim_ledger_group_index
+                ON insurance_claim_ledger (month, company_id, insurer_id, insurance_type_id, state);
+        """)
+
+    @api.model
+    def _load_rates(self, currency_ids, company_ids, date):
+        """Return the rates of ``currency_ids`` on or before ``date`` set for the
+        companies ``company_ids`` or for all companies, in a single query, as
+        {(company_id or None, currency_id): ([dates ascending], [rates])}."""
+        self.env['res.currency.rate'].flush_model(['currency_id', 'company_id', 'name', 'rate'])
+        self.env.cr.execute("""
+            SELECT currency_id, company_id, name, rate
+              FROM res_currency_rate
+             WHERE currency_id = ANY(%s)
+               AND name <= %s
+               AND (company_id IS NULL OR company_id = ANY(%s))
+          ORDER BY name
+        """, (list(currency_ids), date, list(company_ids)))
+        rates = {}
+        for currency_id, company_id, rate_date, rate in self.env.cr.fetchall():
+            dates, values = rates.setdefault((company_id, currency_id), ([], []))
+            dates.append(rate_date)
+            values.append(rate)
+        return rates
+
+    @api.model
+    def _rate_at(self, rates, company_id, currency_id, date):
+        """Same rate as res.currency._get_rates: the last rate of the company
+        on or before ``date``, else the last shared one, else 1."""
+        for key in ((company_id, currency_id), (None, currency_id)):
+            dates, values = rates.get(key, ((), ()))
+            index = bisect.bisect_right(dates, date)
+            if index:
+                return values[index - 1]
+        return 1.0
+
+    @api.model
+    def _load_source_rows(self, where="", params=None, batch_size=10000):
+        """Insert the source rows of the claims matching ``where``, converting their
+        amount to the company currency with the rates loaded in one query per batch."""
+        cr = self.env.cr
+        companies = {}
+        count = 0
+        cr.execute("SELECT id FROM insurance_claim %s ORDER BY id" % where, params or ())
+        claim_ids = [row[0] for row in cr.fetchall()]
+        for index in range(0, len(claim_ids), batch_size):
+            cr.execute("""
+                SELECT id, company_id, insurance_company_id, insurance_type_id, state,
+                       date_trunc('month', claim_date)::date, claim_date, currency_id, COALESCE(amount, 0)
+                  FROM insurance_claim
+                 WHERE id = ANY(%s)
+            """, (claim_ids[index:index + batch_size],))
+            rows = cr.fetchall()
+            # Currencies and companies of the claims to convert, and the latest date needed
+            currency_ids, root_ids, max_date = set(), set(), None
+            for _id, company_id, _insurer, _type, _state, _month, claim_date, currency_id, _amount in rows:
+                if company_id not in companies:
+                    companies[company_id] = self.env['res.company'].browse(company_id)
+                company = companies[company_id]
+                if currency_id and company and claim_date and currency_id != company.currency_id.id:
+                    currency_ids |= {currency_id, company.currency_id.id}
+                    root_ids.add(company.root_id.id)
+                    max_date = max(max_date or claim_date, claim_date)
+            rates = self._load_rates(currency_ids, root_ids, max_date) if currency_ids else {}
+            values = []
+            for claim_id, company_id, insurer_id, type_id, state, month, claim_date, currency_id, amount in rows:
+                company = companies[company_id]
+                if currency_id and company and claim_date and currency_id != company.currency_id.id:
+                    root_id = company.root_id.id
+                    amount = company.currency_id.round(
+                        float(amount) * self._rate_at(rates, root_id, company.currency_id.id, claim_date)
+                        / self._rate_at(rates, root_id, currency_id, claim_date))
+                values.append((claim_id, company_id, insurer_id, type_id, state, month, amount))
+            cr.execute("""
+                INSERT INTO insurance_claim_ledger_source
+                            (claim_id, company_id, insurer_id, insurance_type_id, state, month, amount)
+                     VALUES %s
+            """ % ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(values)),
+                [value for row in values for value in row])
+            count += len(values)
+        return count
+
+    @api.model
+    def refresh(self, full=False):
+        """Refresh the ledger, only reprocessing claims written since the last run
+        unless ``full`` is set. Returns the number of claims reprocessed."""
+        start = time.monotonic()
+        self.env['insurance.claim'].flush_model()
+        cr = self.env.cr
+        refresh_time, since = self._start_refresh()
+        if full or not since:
+            cr.execute("TRUNCATE insurance_claim_ledger, insurance_claim_ledger_source")
+            count = self._load_source_rows()
+            self._aggregate_groups()
+        else:
+            cr.execute("""
+                CREATE TEMP TABLE insurance_claim_ledger_changed ON COMMIT DROP AS
+                    SELECT id FROM insurance_claim WHERE write_date >= %s
+                     UNION
+                    SELECT s.claim_id FROM insurance_claim_ledger_source s
+                     WHERE NOT EXISTS (SELECT 1 FROM insurance_claim c WHERE c.id = s.claim_id)
+            """, (since,))
+            count = cr.rowcount
+            # Groups the changed claims belonged to before the change
+            cr.execute("""
+                CREATE TEMP TABLE insurance_claim_ledger_affected ON COMMIT DROP AS
+                    SELECT DISTINCT company_id, insurer_id, insurance_type_id, state, month
+                      FROM insurance_claim_ledger_source
+                     WHERE claim_id IN (SELECT id FROM insurance_claim_ledger_changed)
+            """)
+            cr.execute("DELETE FROM insurance_claim_ledger_source WHERE claim_id IN (SELECT id FROM insurance_claim_ledger_changed)")
+            cr.execute("SELECT array_agg(id) FROM insurance_claim_ledger_changed")
+            changed_ids = cr.fetchone()[0] or []
+            if changed_ids:
+                self._load_source_rows("WHERE id = ANY(%s)", (changed_ids,))
+            # ... and after it
+            cr.execute("""
+                INSERT INTO insurance_claim_ledger_affected
+                     SELECT DISTINCT company_id, insurer_id, insurance_type_id, state, month
+                       FROM insurance_claim_ledger_source
+                      WHERE claim_id IN (SELECT id FROM insurance_claim_ledger_changed)
+            """)
+            self._aggregate_groups('insurance_claim_ledger_affected')
+            cr.execute("DROP TABLE insurance_claim_ledger_changed, insurance_claim_ledger_affected")
+        self._end_refresh(refresh_time)
+        _logger.info("Claims ledger refreshed: %d claims reprocessed in %.2fs",
+                     count, time.monotonic() - start)
+        return count
+
+    @api.model
+    def _cron_refresh(self):
+        if self.env['ir.config_parameter'].sudo().get_param('insurance_module.module_insurance_analytics'):
+            self.refresh()
+
+    @api.model
+    def action_full_refresh(self):
+        self.refresh(full=True)
@@ -0,0 +1,184 @@
+import contextlib
+import io
+import logging
+import tempfile
+import time
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools.pdf import PdfFileReader, PdfFileWriter
+
+_logger = logging.getLogger(__name__)
+
+
+class InsuranceReportJob(models.Model):
+    _name = 'insurance.report.job'
+    _description = 'Background Report Job'
+    _inherit = ['mail.thread']
+    _order = 'id desc'
+
+    name = fields.Char(string='Name', required=True)
+    report_id = fields.Many2one('ir.actions.report', string='Report', required=True, ondelete='cascade')
+    res_model = fields.Char(string='Model', related='report_id.model')
+    res_ids = fields.Json(string='Records')
+    user_id = fields.Many2one('res.users', string='Requested By', required=True, index=True,
+                              default=lambda self: self.env.user)
+    company_id = fields.Many2one('res.company', string='Company', required=True,
+                                 default=lambda self: self.env.company)
+    chunk_size = fields.Integer(string='Chunk Size', required=True,
+                                default=lambda self: self._default_chunk_size())
+    total_count = fields.Integer(string='Records to Print', readonly=True)
+    processed_count = fields.Integer(string='Records Printed', readonly=True)
+    progress = fields.Float(string='Progress', compute='_compute_progress')
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed')
+    ], string='Status', default='queued', required=True, index=True, tracking=True)
+    error = fields.Text(string='Error', readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', string='PDF', readonly=True)
+    duration = fields.Float(string='Duration (s)', readonly=True)
+
+    @api.model
+    def _default_chunk_size(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'insurance_module.report_job_chunk_size', 100))
+
+    @api.constrains('chunk_size')
+    def _check_chunk_size(self):
+        for job in self:
+            if job.chunk_size <= 0:
+                raise ValidationError(_('The chunk size must be positive.'))
+
+    @api.depends('total_count', 'processed_count')
+    def _compute_progress(self):
+        for job in self:
+            job.progress = 100.0 * job.processed_count / job.total_count if job.total_count else 0.0
+
+    @api.model
+    def _enqueue(self, report_ref, records):
+        """Queue the PDF rendering of ``records`` with the report ``report_ref``."""
+        if not records:
+            raise UserError(_('Please select the records to print.'))
+        report = self.env['ir.actions.report']._get_report(report_ref)
+        job = self.create({
+            'name': _('%(report)s (%(count)s records)', report=report.name, count=len(records)),
+            'report_id': report.id,
+            'res_ids': records.ids,
+            'total_count': len(records),
+        })
+        self.env.ref('insurance_module.ir_cron_insurance_report_job').sudo()._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Report queued'),
+                'message': _('%s will be attached to the job once rendered, you will be notified.', job.name),
+                'type': 'info',
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+
+    def _part_domain(self):
+        self.ensure_one()
+        return [('res_model', '=', self._name), ('res_id', '=', self.id), ('name', '=like', 'part-%')]
+
+    @api.model
+    def _merge_parts(self, parts, output):
+        """Write to the binary file ``output`` the pages of the PDF attachments
+        ``parts``, read one after the other from the filestore."""
+        writer = PdfFileWriter()
+        with contextlib.ExitStack() as stack:
+            # The writer reads the pages from their part until the document is written
+            for part in parts:
+                stream = stack.enter_context(open(part._full_path(part.store_fname), 'rb')
+                                             if part.store_fname else io.BytesIO(part.raw))
+                reader = PdfFileReader(stream, strict=False)
+                for page in range(reader.getNumPages()):
+                    writer.addPage(reader.getPage(page))
+            writer.write(output)
+
+    @api.model
+    def _prefetch_chunk(self, records):
+        """Load the stored fields of a chunk and the names of its related records in a few queries."""
+        fnames = [fname for fname, field in records._fields.items()
+                  if field.store and field.type not in ('binary', 'one2many', 'many2many')]
+        records.fetch(fnames)
+        for fname in fnames:
+            if records._fields[fname].type == 'many2one':
+                records[fname].mapped('display_name')
+
+    def _run(self):
+        """Render the next chunks of the job, committing after each one so that
+        a job interrupted by the worker limits resumes where it stopped."""
+        self.ensure_one()
+        start = time.monotonic()
+        self.write({'state': 'running', 'error': False})
+        self.env.cr.commit()
+        report = self.report_id.with_user(self.user_id).with_company(self.company_id)
+        Attachment = self.env['ir.attachment'].sudo()
+        res_ids = self.res_ids or []
+        while self.processed_count < len(res_ids):
+            chunk_ids = res_ids[self.processed_count:self.processed_count + self.chunk_size]
+            records = report.env[self.res_model].browse(chunk_ids).exists()
+            if records:
+                self._prefetch_chunk(records)
+                pdf, _format = report._render_qweb_pdf(report.report_name, res_ids=records.ids)
+                Attachment.create({
+                    'name': 'part-%06d.pdf' % self.processed_count,
+                    'raw': pdf,
+                    'res_model': self._name,
+                    'res_id': self.id,
+                    'mimetype': 'application/pdf',
+                })
+            self.processed_count += len(chunk_ids)
+            self.env.cr.commit()
+            # Rendered chunks are not needed anymore, keep the cache small
+            self.env.invalidate_all()
+            _logger.info("Report job %s: %d/%d records rendered", self.id, self.processed_count, len(res_ids))
+        parts = Attachment.search(self._part_domain(), order='name')
+        with tempfile.TemporaryFile() as merged:
+            self._merge_parts(parts, merged)
+            attachment = Attachment._create_from_file({
+                'name': '%s.pdf' % self.report_id.name,
+                'res_model': self._name,
+                'res_id': self.id,
+                'mimetype': 'application/pdf',
+            }, merged)
+        parts.unlink()
+        self.write({
+            'state': 'done',
+            'attachment_id': attachment.id,
+            'duration': self.duration + time.monotonic() - start,
+        })
+        self.message_post(
+            body=_('%s is ready.', self.name),
+            attachment_ids=attachment.ids,
+            partner_ids=self.user_id.partner_id.ids,
+            subtype_xmlid='mail.mt_comment',
+        )
+
+    @api.model
+    def _cron_process_jobs(self):
+        jobs = self.search([('state', 'in', ('queued', 'running'))], order='id')
+        for job in jobs:
+            try:
+                job._run()
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.exception("Report job %s failed", job.id)
+                job.write({'state': 'failed', 'error': str(e)})
+            self.env.cr.commit()
+
+    def action_retry(self):
+        self.filtered(lambda j: j.state == 'failed').write({'state': 'queued', 'error': False})
+        self.env.ref('insurance_module.ir_cron_insurance_report_job').sudo()._trigger()
+
+    def action_download(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % self.attachment_id.id,
+            'target': 'self',
+        }
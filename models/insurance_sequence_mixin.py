@@ -0,0 +1,22 @@
+from odoo import models, api, _
+
+
+class InsuranceSequenceMixin(models.AbstractModel):
+    _name = 'insurance.sequence.mixin'
+    _description = 'Insurance Sequence Mixin'
+
+    # ir.sequence code used for the reference, defaults to the model name
+    _sequence_code = None
+
+    @api.model
+    def _assign_sequence_names(self, vals_list, new_name=None):
+        """Give every pending ``vals`` in the batch a reference from a single
+        block reservation on the model's sequence."""
+        new_name = new_name or _('New')
+        pending = [vals for vals in vals_list if vals.get('name', new_name) == new_name]
+        if not pending:
+            return vals_list
+        names = self.env['ir.sequence'].next_block_by_code(self._sequence_code or self._name, len(pending))
+        for index, vals in enumerate(pending):
+            vals['name'] = names[index] if index < len(names) else new_name
+        return vals_list
@@ -0,0 +1,43 @@
+import hashlib
+import os
+
+from odoo import models, api
+
+# Size of the blocks read and written while copying a file to the filestore
+ATTACHMENT_BLOCK_SIZE = 1024 * 1024
+
+
+class IrAttachment(models.Model):
+    _inherit = 'ir.attachment'
+
+    @api.model
+    def _create_from_file(self, vals, fileobj):
+        """Create an attachment holding the content of the binary file object
+        ``fileobj``, hashed and copied to the filestore block by block so the
+        file is never loaded in memory."""
+        fileobj.seek(0)
+        if self._storage() != 'file':
+            # Database storage needs the whole value anyway
+            return self.create(dict(vals, raw=fileobj.read()))
+        sha1, file_size = hashlib.sha1(), 0
+        for block in iter(lambda: fileobj.read(ATTACHMENT_BLOCK_SIZE), b''):
+            sha1.update(block)
+            file_size += len(block)
+        checksum = sha1.hexdigest()
+        # Same layout as _get_path, files with the same content are shared
+        store_fname = '%s/%s' % (checksum[:2], checksum)
+        full_path = self._full_path(store_fname)
+        if not os.path.exists(full_path):
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            fileobj.seek(0)
+            partial_path = '%s.%s.part' % (full_path, os.getpid())
+            with open(partial_path, 'wb') as stored:
+                for block in iter(lambda: fileobj.read(ATTACHMENT_BLOCK_SIZE), b''):
+                    stored.write(block)
+            os.replace(partial_path, full_path)
+        self._mark_for_gc(store_fname)
+        fileobj.seek(0)
+        mimetype = vals.get('mimetype') or self._compute_mimetype(
+            {'raw': fileobj.read(ATTACHMENT_BLOCK_SIZE), 'name': vals.get('name')})
+        return self.create(dict(vals, store_fname=store_fname, checksum=checksum,
+                                file_size=file_size, mimetype=mimetype))
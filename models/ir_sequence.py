@@ -0,0 +1,41 @@
+from odoo import models, api
+
+
+class IrSequence(models.Model):
+    _inherit = 'ir.sequence'
+
+    def _next_block(self, count):
+        """Reserve ``count`` consecutive numbers in one round trip and return
+        them formatted with the sequence prefix, suffix and padding."""
+        self.ensure_one()
+        if self.use_date_range:
+            # Date range sub-sequences are resolved per date, keep the standard path
+            return [self._next() for _i in range(count)]
+        if self.implementation == 'standard':
+            self._cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                ('ir_sequence_%03d' % self.id, count),
+            )
+            numbers = sorted(row[0] for row in self._cr.fetchall())
+        else:
+            self.flush_recordset(['number_next'])
+            self._cr.execute(
+                "UPDATE ir_sequence SET number_next = number_next + %s WHERE id = %s RETURNING number_next",
+                (self.number_increment * count, self.id),
+            )
+            last = self._cr.fetchone()[0]
+            self.invalidate_recordset(['number_next'])
+            numbers = range(last - self.number_increment * count, last, self.number_increment)
+        return [self.get_next_char(number) for number in numbers]
+
+    @api.model
+    def next_block_by_code(self, sequence_code, count):
+        """Block variant of ``next_by_code``: return ``count`` names, or an
+        empty list when no sequence matches the code."""
+        self.check_access('read')
+        company_id = self.env.company.id
+        sequence = self.search([('code', '=', sequence_code), ('company_id', 'in', [company_id, False])],
+                               order='company_id', limit=1)
+        if not sequence or count <= 0:
+            return []
+        return sequence._next_block(count)
@@ -0,0 +1,289 @@
+import csv
+import io
+import itertools
+import json
+import logging
+import time
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError, ValidationError
+
+_logger = logging.getLogger(__name__)
+
+# Row errors kept in the import log; the others are only counted
+IMPORT_ERROR_LOG_LIMIT = 1000
+
+
+class InsuranceLegacyImport(models.Model):
+    _name = 'insurance.legacy.import'
+    _description = 'Legacy Safety Records Import'
+    _inherit = ['mail.thread']
+    _order = 'id desc'
+    _rec_name = 'file_name'
+
+    # Field used to resolve a textual reference to each related model
+    _lookup_fields = {
+        'hr.employee': 'name',
+        'hr.department': 'name',
+        'fleet.vehicle': 'license_plate',
+        'incident.report': 'name',
+        'insurance.type': 'code',
+        'res.partner': 'name',
+        'res.users': 'login',
+    }
+
+    target_model = fields.Selection([
+        ('incident.report', 'Incident Reports'),
+        ('incident.investigator', 'Incident Investigators'),
+        ('insurance.claim', 'Insurance Claims'),
+        ('vehicle.telematics.sample', 'Telematics Samples'),
+    ], string='Import Into', required=True, default='incident.report')
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+    ], string='File Format', required=True, default='csv')
+    data_file = fields.Binary(string='File', required=True, attachment=True)
+    file_name = fields.Char(string='File Name')
+    batch_size = fields.Integer(string='Batch Size', default=500, required=True)
+    user_id = fields.Many2one('res.users', string='Requested By', required=True,
+                              default=lambda self: self.env.user)
+    row_offset = fields.Integer(string='Rows Processed', readonly=True, copy=False,
+                                help='Rows of the file already processed, committed with each batch '
+                                     'so an interrupted import resumes after the last one.')
+    imported_count = fields.Integer(string='Imported Records', readonly=True, copy=False)
+    error_count = fields.Integer(string='Rejected Rows', readonly=True, copy=False)
+    error_log = fields.Text(string='Rejected Rows Log', readonly=True, copy=False)
+    error = fields.Text(string='Error', readonly=True, copy=False)
+    duration = fields.Float(string='Duration (s)', readonly=True, copy=False)
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='draft', required=True, tracking=True, copy=False)
+
+    @api.constrains('batch_size')
+    def _check_batch_size(self):
+        for record in self:
+            if record.batch_size <= 0:
+                raise ValidationError(_('The batch size must be positive.'))
+
+    def _open_data_file(self):
+        """Return a binary file object on the stored upload without loading it in memory."""
+        self.ensure_one()
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('res_field', '=', 'data_file'),
+        ], limit=1)
+        if not attachment:
+            raise UserError(_('Please upload a file to import.'))
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(attachment.raw or b'')
+
+    @api.model
+    def _iter_rows(self, stream, file_format):
+        """Yield one dict per row of a CSV or JSON Lines binary stream, or a
+        ValueError in place of a JSON line that is not an object."""
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        if file_format == 'csv':
+            yield from csv.DictReader(text)
+        else:
+            for line in text:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield ValueError(_('Invalid JSON: %s', e))
+                    continue
+                yield row if isinstance(row, dict) else ValueError(_('A JSON object is expected.'))
+
+    @api.model
+    def _iter_batches(self, rows, batch_size):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @api.model
+    def _is_id_reference(self, field, value):
+        return isinstance(value, int) or (isinstance(value, str) and value.isdigit()
+                                          and field.comodel_name not in self._lookup_fields)
+
+    @api.model
+    def _fill_lookup_cache(self, model, batch, cache):
+        """Resolve all unseen references of the batch with one search per related
+        model; textual keys and ids that match no record resolve to False."""
+        missing = {}
+        for row in batch:
+            if not isinstance(row, dict):
+                continue
+            for fname, value in row.items():
+                field = model._fields.get(fname)
+                if not field or field.type != 'many2one' or value in ('', None):
+                    continue
+                if self._is_id_reference(field, value):
+                    value = int(value)
+                elif not (isinstance(value, str) and field.comodel_name in self._lookup_fields):
+                    continue
+                comodel_cache = cache.setdefault(field.comodel_name, {})
+                if value not in comodel_cache:
+                    missing.setdefault(field.comodel_name, set()).add(value)
+        for comodel_name, keys in missing.items():
+            comodel_cache = cache[comodel_name]
+            ids = [key for key in keys if isinstance(key, int)]
+            for record_id in self.env[comodel_name].browse(ids).exists().ids:
+                comodel_cache[record_id] = record_id
+            names = [key for key in keys if isinstance(key, str)]
+            if names:
+                key_field = self._lookup_fields[comodel_name]
+                for record in self.env[comodel_name].search_read([(key_field, 'in', names)], [key_field]):
+                    comodel_cache.setdefault(record[key_field], record['id'])
+            for key in keys:
+                comodel_cache.setdefault(key, False)
+
+    @api.model
+    def _convert_value(self, field, value, cache):
+        if value in ('', None):
+            return False
+        if field.type == 'boolean':
+            return value if isinstance(value, bool) else str(value).strip().lower() in ('1', 'true', 'yes', 'y', 'x')
+        if field.type == 'integer':
+            return int(value)
+        if field.type in ('float', 'monetary'):
+            return float(value)
+        if field.type == 'many2one':
+            key = int(value) if self._is_id_reference(field, value) else value
+            return cache.get(field.comodel_name, {}).get(key, False)
+        return value
+
+    @api.model
+    def _prepare_vals(self, model, row, cache):
+        """Return the values of ``row``; raise ValueError with the reason when
+        one of them cannot be imported."""
+        vals = {}
+        for fname, value in row.items():
+            field = model._fields.get(fname)
+            # Computed and related fields are derived by the target model itself
+            if not field or not field.store or field.compute or field.related:
+                continue
+            try:
+                vals[fname] = self._convert_value(field, value, cache)
+            except (ValueError, TypeError):
+                raise ValueError(_('%(field)s: invalid value "%(value)s"', field=fname, value=value))
+            if field.type == 'many2one' and value not in ('', None) and not vals[fname]:
+                raise ValueError(_('%(field)s: no %(model)s matches "%(value)s"',
+                                   field=fname, model=self.env[field.comodel_name]._description, value=value))
+        return vals
+
+    @api.model
+    def _prepare_vals_list(self, model, batch, cache):
+        """Return the (index in the batch, values) of the importable rows of
+        ``batch`` and an (index in the batch, reason) list for the rejected ones."""
+        vals_list, errors = [], []
+        for index, row in enumerate(batch):
+            if isinstance(row, ValueError):
+                errors.append((index, str(row)))
+                continue
+            try:
+                vals_list.append((index, self._prepare_vals(model, row, cache)))
+            except ValueError as e:
+                errors.append((index, str(e)))
+        return vals_list, errors
+
+    @api.model
+    def _create_rows(self, model, vals_list):
+        """Create the rows of a batch, all at once when possible. If one of them
+        breaks a required field or a constraint, every row is created under its
+        own savepoint and the failing ones are returned as (index, reason)."""
+        try:
+            with self.env.cr.savepoint():
+                model.create([vals for _index, vals in vals_list])
+            return []
+        except Exception:
+            pass
+        errors = []
+        for index, vals in vals_list:
+            try:
+                with self.env.cr.savepoint():
+                    model.create(vals)
+            except Exception as e:
+                errors.append((index, str(e)))
+        return errors
+
+    def _run(self):
+        """Import the rows past ``row_offset``, one batch at a time.
+
+        The created records and the new offset are committed together after
+        each batch, so an import interrupted or failed midway resumes after
+        the last committed batch without creating any row twice.
+        """
+        self.ensure_one()
+        start = time.monotonic()
+        self.write({'state': 'running', 'error': False})
+        self.env.cr.commit()
+        model = self.env[self.target_model].with_user(self.user_id).with_context(
+            tracking_disable=True, mail_create_nolog=True, mail_create_nosubscribe=True)
+        cache = {}
+        with self._open_data_file() as stream:
+            # Skip the rows of the batches committed by a previous run
+            rows = itertools.islice(self._iter_rows(stream, self.file_format), self.row_offset, None)
+            for batch in self._iter_batches(rows, self.batch_size):
+                self._fill_lookup_cache(model, batch, cache)
+                vals_list, errors = self._prepare_vals_list(model, batch, cache)
+                create_errors = self._create_rows(model, vals_list)
+                errors = sorted(errors + create_errors)
+                log = [_('Row %(row)s: %(reason)s', row=self.row_offset + index + 1, reason=reason)
+                       for index, reason in errors[:max(IMPORT_ERROR_LOG_LIMIT - self.error_count, 0)]]
+                self.write({
+                    'row_offset': self.row_offset + len(batch),
+                    'imported_count': self.imported_count + len(vals_list) - len(create_errors),
+                    'error_count': self.error_count + len(errors),
+                    'error_log': '\n'.join(filter(None, [self.error_log] + log)) or False,
+                    'duration': self.duration + time.monotonic() - start,
+                })
+                start = time.monotonic()
+                self.env.cr.commit()
+                # Imported records are not needed anymore, keep the cache small
+                self.env.invalidate_all()
+                _logger.info("Legacy import %s: %d rows processed, %d imported, %d rejected (%.0f rows/s)",
+                             self.id, self.row_offset, self.imported_count, self.error_count,
+                             self.row_offset / self.duration if self.duration else 0.0)
+        self.write({'state': 'done', 'duration': self.duration + time.monotonic() - start})
+        self.message_post(
+            body=_('Import done: %(imported)s records imported, %(rejected)s rows rejected.',
+                   imported=self.imported_count, rejected=self.error_count),
+            partner_ids=self.user_id.partner_id.ids,
+            subtype_xmlid='mail.mt_comment',
+        )
+
+    @api.model
+    def _cron_process_imports(self):
+        imports = self.search([('state', 'in', ('queued', 'running'))], order='id')
+        for legacy_import in imports:
+            try:
+                legacy_import._run()
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.exception("Legacy import %s failed", legacy_import.id)
+                legacy_import.write({'state': 'failed', 'error': str(e)})
+            self.env.cr.commit()
+
+    def action_import(self):
+        self.ensure_one()
+        self._open_data_file().close()
+        self.write({'state': 'queued'})
+        self.env.ref('insurance_module.ir_cron_insurance_legacy_import').sudo()._trigger()
+
+    def action_retry(self):
+        # Resume after the last committed batch
+        self.filtered(lambda i: i.state == 'failed').write({'state': 'queued', 'error': False})
+        self.env.ref('insurance_module.ir_cron_insurance_legacy_import').sudo()._trigger()
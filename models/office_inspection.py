@@ -1,21 +1,23 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
 from datetime import datetime
 
 class OfficeInspection(models.Model):
     _name = 'office.inspection'
     _description = 'Office Safety Inspection'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'insurance.sequence.mixin', 'safety.evidence.mixin']
     _order = 'inspection_date desc'
 
     name = fields.Char(string='Reference', required=True, copy=False, readonly=True,
                       default=lambda self: _('New'))
     inspection_date = fields.Date(string='Inspection Date', required=True, tracking=True,
                                 default=fields.Date.context_today)
-    inspector_id = fields.Many2one('res.users', string='Safety Officer', required=True,
+    inspector_id = fields.Many2one('res.users', string='Safety Officer', required=True, index=True,
                                  default=lambda self: self.env.user, tracking=True)
     department_id = fields.Many2one('hr.department', string='Department', required=True)
     location = fields.Char(string='Location', required=True)
+    location_id = fields.Many2one('safety.location', string='Site Location', index='btree_not_null')
     company_id = fields.Many2one('res.company', string='Company', required=True,
                                 default=lambda self: self.env.company)
     state = fields.Selection([
@@ -44,13 +46,20 @@ class OfficeInspection(models.Model):
     
     attachment_ids = fields.Many2many('ir.attachment', string='Attachments')
     
+    def init(self):
+        # The own-records rule filters on the creator
+        create_index(self._cr, 'office_inspection_create_uid_index', self._table, ['create_uid'])
+
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get('name', _('New')) == _('New'):
-                vals['name'] = self.env['ir.sequence'].next_by_code('office.inspection') or _('New')
+        self._assign_sequence_names(vals_list)
         return super(OfficeInspection, self).create(vals_list)
     
+    @api.onchange('location_id')
+    def _onchange_location_id(self):
+        if self.location_id:
+            self.location = self.location_id.complete_name
+
     def action_start_inspection(self):
         self.write({'state': 'in_progress'})
     
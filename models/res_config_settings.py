@@ -27,6 +27,16 @@ class ResConfigSettings(models.TransientModel):
         string='Safety Training Management',
         help='Enable safety training management'
     )
+    incident_vehicle_snapshot = fields.Boolean(
+        string='Snapshot Vehicle Data on Incidents',
+        help='Capture vehicle make, model, odometer and service data once when an incident is reported '
+             'instead of keeping it in sync with the fleet'
+    )
+    report_job_chunk_size = fields.Integer(
+        string='Background Report Chunk Size',
+        default=100,
+        help='Number of records rendered at a time by background report jobs'
+    )
 
     def set_values(self):
         super(ResConfigSettings, self).set_values()
@@ -36,6 +46,8 @@ class ResConfigSettings(models.TransientModel):
         self.env['ir.config_parameter'].sudo().set_param('insurance_module.module_insurance_analytics', self.module_insurance_analytics)
         self.env['ir.config_parameter'].sudo().set_param('insurance_module.module_vehicle_maintenance_reminder', self.module_vehicle_maintenance_reminder)
         self.env['ir.config_parameter'].sudo().set_param('insurance_module.module_safety_training_management', self.module_safety_training_management)
+        self.env['ir.config_parameter'].sudo().set_param('insurance_module.incident_vehicle_snapshot', self.incident_vehicle_snapshot)
+        self.env['ir.config_parameter'].sudo().set_param('insurance_module.report_job_chunk_size', self.report_job_chunk_size)
 
     def get_values(self):
         res = super(ResConfigSettings, self).get_values()
@@ -45,6 +57,8 @@ class ResConfigSettings(models.TransientModel):
             module_insurance_claim_automation=self.env['ir.config_parameter'].sudo().get_param('insurance_module.module_insurance_claim_automation', default=False),
             module_insurance_analytics=self.env['ir.config_parameter'].sudo().get_param('insurance_module.module_insurance_analytics', default=False),
             module_vehicle_maintenance_reminder=self.env['ir.config_parameter'].sudo().get_param('insurance_module.module_vehicle_maintenance_reminder', default=False),
-            module_safety_training_management=self.env['ir.config_parameter'].sudo().get_param('insurance_module.module_safety_training_management', default=False)
+            module_safety_training_management=self.env['ir.config_parameter'].sudo().get_param('insurance_module.module_safety_training_management', default=False),
+            incident_vehicle_snapshot=self.env['ir.config_parameter'].sudo().get_param('insurance_module.incident_vehicle_snapshot', default=False),
+            report_job_chunk_size=int(self.env['ir.config_parameter'].sudo().get_param('insurance_module.report_job_chunk_size', default=100))
         )
         return res 
\ No newline at end of file
@@ -0,0 +1,178 @@
+import numpy as np
+from markupsafe import Markup
+
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import UserError
+
+# Share of all flagged causes covered by the "vital few" of a Pareto ranking
+PARETO_THRESHOLD = 0.8
+# Flag prefixes analysed on each source model
+ROOT_CAUSE_PREFIXES = ('injury_', 'unsafe_')
+
+# Source model: (table, date column, department expression, join)
+_ROOT_CAUSE_SOURCES = {
+    'accident.investigation': ('accident_investigation', 's.investigation_date',
+                               'i.department_id', 'LEFT JOIN incident_report i ON i.id = s.incident_id'),
+    'incident.report': ('incident_report', 's.incident_datetime', 's.department_id', ''),
+}
+
+
+class SafetyRootCauseAnalysis(models.TransientModel):
+    _name = 'safety.root.cause.analysis'
+    _description = 'Root Cause Pareto Analysis'
+
+    source = fields.Selection([
+        ('accident.investigation', 'Investigations (injuries, unsafe conditions and acts)'),
+        ('incident.report', 'Incident Reports (injuries)'),
+    ], string='Analyse', required=True, default='accident.investigation')
+    company_id = fields.Many2one('res.company', string='Company', required=True,
+                                 default=lambda self: self.env.company,
+                                 domain=lambda self: [('id', 'in', self.env.companies.ids)])
+    department_id = fields.Many2one('hr.department', string='Department')
+    year = fields.Integer(string='Year', default=lambda self: fields.Date.context_today(self).year)
+    record_count = fields.Integer(string='Records Analysed', readonly=True)
+    line_ids = fields.One2many('safety.root.cause.analysis.line', 'analysis_id', string='Pareto Ranking')
+    heatmap = fields.Html(string='Co-occurrence', readonly=True, sanitize=False)
+
+    @api.model
+    def _get_flag_fields(self, source):
+        flags = sorted(fname for fname, field in self.env[source]._fields.items()
+                       if field.type == 'boolean' and field.store and fname.startswith(ROOT_CAUSE_PREFIXES))
+        # Every record is packed into a single signed 64-bit integer
+        if len(flags) > 63:
+            raise UserError(_('Too many flags to analyse on %s.', self.env[source]._description))
+        return flags
+
+    @api.model
+    def _load_bit_matrix(self, source, company_id, department_id, year):
+        """Load the flags of every matching record in one query, each row packed
+        into a bigint, and unpack them into a records x flags 0/1 matrix."""
+        flags = self._get_flag_fields(source)
+        table, date_column, department, join = _ROOT_CAUSE_SOURCES[source]
+        where, params = ['s.company_id = %s'], [company_id]
+        if department_id:
+            where.append('%s = %%s' % department)
+            params.append(department_id)
+        if year:
+            where.append('EXTRACT(YEAR FROM %s) = %%s' % date_column)
+            params.append(year)
+        self.env[source].flush_model(flags + ['company_id'])
+        self.env.cr.execute("""
+            SELECT %s
+              FROM %s s %s
+             WHERE %s
+        """ % (
+            ' | '.join('(CASE WHEN s.%s THEN %d::bigint ELSE 0 END)' % (fname, 1 << bit)
+                       for bit, fname in enumerate(flags)) or '0',
+            table, join, ' AND '.join(where),
+        ), params)
+        codes = np.fromiter((row[0] for row in self.env.cr.fetchall()), dtype=np.int64).view(np.uint64)
+        shifts = np.arange(len(flags), dtype=np.uint64)
+        matrix = ((codes[:, None] >> shifts) & np.uint64(1)).astype(np.int32)
+        return flags, matrix
+
+    @api.model
+    def _source_signature(self, source, company_id):
+        """Cheap fingerprint of the source data, so a cached result is dropped
+        as soon as a record is added, changed or removed."""
+        signature = []
+        # Investigations are filtered on the department of their incident
+        for model in {source, 'incident.report'}:
+            self.env[model].flush_model()
+            self.env.cr.execute("SELECT count(*), max(write_date) FROM %s WHERE company_id = %%s"
+                                % self.env[model]._table, (company_id,))
+            signature.append((model,) + tuple(self.env.cr.fetchone()))
+        return tuple(sorted(signature))
+
+    @api.model
+    @tools.ormcache('source', 'company_id', 'department_id', 'year', 'signature')
+    def _compute_pareto(self, source, company_id, department_id, year, signature):
+        """Vectorized frequencies, Pareto ranking and co-occurrence of the flags.
+
+        Returns the number of records, the ranked (flag, count, share, cumulative
+        share) tuples and the co-occurrence matrix of the ranked flags, as tuples
+        so the cached value cannot be altered.
+        """
+        flags, matrix = self._load_bit_matrix(source, company_id, department_id, year)
+        frequencies = matrix.sum(axis=0)
+        total = frequencies.sum()
+        order = np.argsort(-frequencies, kind='stable')
+        order = order[frequencies[order] > 0]
+        cumulative = np.cumsum(frequencies[order]) / total if total else np.zeros(len(order))
+        ranking = tuple(
+            (flags[index], int(frequencies[index]), float(frequencies[index] / total), float(share))
+            for index, share in zip(order, cumulative)
+        )
+        # Number of records on which each pair of flags is set together
+        cooccurrence = (matrix.T @ matrix)[np.ix_(order, order)]
+        return len(matrix), ranking, tuple(map(tuple, cooccurrence.tolist()))
+
+    def _render_heatmap(self, ranking, cooccurrence):
+        flag_fields = self.env[self.source]._fields
+        labels = [flag_fields[fname]._description_string(self.env) for fname, *_counts in ranking]
+        peak = max((value for row in cooccurrence for value in row), default=0) or 1
+        header = Markup('').join(Markup('<th class="text-center small">%s</th>') % (index + 1)
+                                 for index in range(len(labels)))
+        rows = []
+        for index, (label, values) in enumerate(zip(labels, cooccurrence)):
+            cells = Markup('').join(
+                Markup('<td class="text-center" style="background-color: rgba(220, 53, 69, %.2f)">%s</td>')
+                % (value / peak, value or '') for value in values)
+            rows.append(Markup('<tr><th class="small">%s. %s</th>%s</tr>') % (index + 1, label, cells))
+        return Markup('<table class="table table-sm table-bordered"><thead><tr><th/>%s</tr></thead>'
+                      '<tbody>%s</tbody></table>') % (header, Markup('').join(rows))
+
+    def action_analyse(self):
+        self.ensure_one()
+        signature = self._source_signature(self.source, self.company_id.id)
+        record_count, ranking, cooccurrence = self._compute_pareto(
+            self.source, self.company_id.id, self.department_id.id or False, self.year or False, signature)
+        flag_fields = self.env[self.source]._fields
+        self.line_ids = [(5, 0, 0)] + [(0, 0, {
+            'rank': rank,
+            'flag': fname,
+            'name': flag_fields[fname]._description_string(self.env),
+            'category': 'injury' if fname.startswith('injury_') else 'unsafe',
+            'count': count,
+            'share': share * 100,
+            'cumulative_share': cumulative * 100,
+            'vital_few': cumulative - share < PARETO_THRESHOLD,
+        }) for rank, (fname, count, share, cumulative) in enumerate(ranking, start=1)]
+        self.record_count = record_count
+        self.heatmap = self._render_heatmap(ranking, cooccurrence) if ranking else False
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
+
+    def action_view_pareto_chart(self):
+        self.ensure_one()
+        return {
+            'name': _('Pareto Chart'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'safety.root.cause.analysis.line',
+            'view_mode': 'graph,list',
+            'domain': [('analysis_id', '=', self.id)],
+        }
+
+
+class SafetyRootCauseAnalysisLine(models.TransientModel):
+    _name = 'safety.root.cause.analysis.line'
+    _description = 'Root Cause Pareto Ranking Line'
+    _order = 'rank'
+
+    analysis_id = fields.Many2one('safety.root.cause.analysis', string='Analysis', required=True, ondelete='cascade')
+    rank = fields.Integer(string='Rank')
+    flag = fields.Char(string='Field')
+    name = fields.Char(string='Cause')
+    category = fields.Selection([
+        ('injury', 'Injury'),
+        ('unsafe', 'Unsafe Condition / Act')
+    ], string='Category')
+    count = fields.Integer(string='Occurrences')
+    share = fields.Float(string='Share (%)', digits=(5, 1))
+    cumulative_share = fields.Float(string='Cumulative (%)', digits=(5, 1))
+    vital_few = fields.Boolean(string='Vital Few')
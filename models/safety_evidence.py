@@ -0,0 +1,207 @@
+import base64
+import hashlib
+import io
+import logging
+import os
+import re
+import time
+import uuid
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import config
+from odoo.tools.image import image_process
+
+_logger = logging.getLogger(__name__)
+
+# Size of the blocks read and written while streaming uploads
+EVIDENCE_BLOCK_SIZE = 1024 * 1024
+# Staged uploads left unfinished for longer than this are removed
+EVIDENCE_UPLOAD_MAX_AGE = 24 * 3600
+
+
+class SafetyEvidence(models.Model):
+    _name = 'safety.evidence'
+    _description = 'Safety Evidence'
+    _order = 'id desc'
+
+    name = fields.Char(string='Name', required=True)
+    checksum = fields.Char(string='Checksum (SHA-1)', required=True, readonly=True, index=True, copy=False)
+    mimetype = fields.Char(string='Type', readonly=True)
+    file_size = fields.Integer(string='Size', readonly=True)
+    # Not required at the ORM level: staged uploads link the file they stored
+    # in the filestore themselves, without loading it in memory
+    data = fields.Binary(string='File', attachment=True)
+    thumbnail = fields.Image(string='Thumbnail', max_width=256, max_height=256, readonly=True)
+    thumbnail_pending = fields.Boolean(string='Thumbnail Pending', readonly=True, index=True, copy=False)
+    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
+
+    _sql_constraints = [
+        ('checksum_uniq', 'unique (checksum, company_id)', 'This file is already in the evidence store.'),
+    ]
+
+    @api.model
+    def _find_by_checksum(self, checksum):
+        """Return the evidence of the current company holding the file with
+        ``checksum``, provided the current user can read it."""
+        evidence = self.search([('checksum', '=', checksum), ('company_id', '=', self.env.company.id)], limit=1)
+        if evidence and evidence.has_access('read'):
+            return evidence
+        return self.browse()
+
+    @api.model
+    def _get_or_create(self, name, fileobj, mimetype=None):
+        """Return the evidence holding the content of the binary file object
+        ``fileobj``, storing it only if no evidence of the company has the same
+        content yet. The file is hashed and stored block by block, never loaded
+        in memory."""
+        fileobj.seek(0)
+        head = fileobj.read(EVIDENCE_BLOCK_SIZE)
+        sha1 = hashlib.sha1(head)
+        for block in iter(lambda: fileobj.read(EVIDENCE_BLOCK_SIZE), b''):
+            sha1.update(block)
+        evidence = self._find_by_checksum(sha1.hexdigest())
+        if evidence:
+            return evidence
+        Attachment = self.env['ir.attachment'].sudo()
+        attachment = Attachment._create_from_file({
+            'name': 'data',
+            'res_model': self._name,
+            'res_field': 'data',
+            'mimetype': mimetype or Attachment._compute_mimetype({'raw': head, 'name': name}),
+        }, fileobj)
+        evidence = self.create({
+            'name': name,
+            'checksum': attachment.checksum,
+            'file_size': attachment.file_size,
+            'mimetype': attachment.mimetype,
+        })
+        attachment.res_id = evidence.id
+        evidence.invalidate_recordset(['data'])
+        return evidence
+
+    @api.model
+    def _import_attachments(self, records, fname):
+        """Move the attachments of the many2many ``fname`` of ``records`` into
+        the evidence store, linking each record to the evidence of its files."""
+        for record in records:
+            evidences = self.browse()
+            for attachment in record[fname]:
+                with (open(attachment._full_path(attachment.store_fname), 'rb') if attachment.store_fname
+                      else io.BytesIO(attachment.raw or b'')) as fileobj:
+                    evidences |= self.with_company(record.company_id)._get_or_create(
+                        attachment.name, fileobj, attachment.mimetype)
+            record.write({'evidence_ids': [(4, evidence.id) for evidence in evidences]})
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if vals.get('data') and not vals.get('checksum'):
+                # Uploaded from the form rather than through a chunked upload
+                raw = base64.b64decode(vals['data'])
+                vals['checksum'] = hashlib.sha1(raw).hexdigest()
+                vals['file_size'] = len(raw)
+                vals.setdefault('mimetype', self.env['ir.attachment']._compute_mimetype(
+                    {'raw': raw, 'name': vals.get('name')}))
+            if (vals.get('mimetype') or '').startswith('image/'):
+                vals['thumbnail_pending'] = True
+        records = super(SafetyEvidence, self).create(vals_list)
+        if records.filtered('thumbnail_pending'):
+            self.env.ref('insurance_module.ir_cron_safety_evidence').sudo()._trigger()
+        return records
+
+    # Chunked uploads: the chunks are appended to a staging file in the filestore,
+    # named after the uploading user so nobody else can write to it.
+
+    @api.model
+    def _get_upload_path(self, upload_id):
+        if not re.fullmatch(r'[0-9a-f]{32}', upload_id or ''):
+            raise UserError(_('Invalid upload.'))
+        directory = os.path.join(config.filestore(self.env.cr.dbname), 'evidence_uploads')
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, '%s-%s' % (self.env.uid, upload_id))
+
+    @api.model
+    def _start_upload(self, checksum=None):
+        """Start a chunked upload. When the client already knows the SHA-1 of the
+        file and the store has it, the existing evidence is returned instead."""
+        if checksum:
+            evidence = self._find_by_checksum(checksum)
+            if evidence:
+                return {'evidence_id': evidence.id, 'duplicate': True}
+        upload_id = uuid.uuid4().hex
+        open(self._get_upload_path(upload_id), 'wb').close()
+        return {'upload_id': upload_id}
+
+    @api.model
+    def _append_chunk(self, upload_id, offset, stream):
+        """Append ``stream`` to the staged upload; ``offset`` must be the size
+        received so far, which makes a retried chunk harmless."""
+        path = self._get_upload_path(upload_id)
+        if not os.path.exists(path):
+            raise UserError(_('Unknown upload.'))
+        size = os.path.getsize(path)
+        if offset != size:
+            return size
+        with open(path, 'ab') as staged:
+            while True:
+                block = stream.read(EVIDENCE_BLOCK_SIZE)
+                if not block:
+                    break
+                staged.write(block)
+        return os.path.getsize(path)
+
+    @api.model
+    def _finish_upload(self, upload_id, name, mimetype=None):
+        """Turn a staged upload into evidence, reusing the stored file when the
+        same content was uploaded before."""
+        path = self._get_upload_path(upload_id)
+        if not os.path.exists(path):
+            raise UserError(_('Unknown upload.'))
+        try:
+            with open(path, 'rb') as staged:
+                return self._get_or_create(name, staged, mimetype)
+        finally:
+            os.unlink(path)
+
+    @api.model
+    def _link_to_record(self, evidence, res_model, res_id):
+        if res_model not in self.env or 'evidence_ids' not in self.env[res_model]._fields:
+            raise UserError(_('Evidence cannot be linked to this document.'))
+        record = self.env[res_model].browse(res_id).exists()
+        if not record:
+            raise UserError(_('The document does not exist anymore.'))
+        record.write({'evidence_ids': [(4, evidence.id)]})
+
+    @api.model
+    def _cron_generate_thumbnails(self, batch_size=50):
+        start = time.monotonic()
+        evidences = self.search([('thumbnail_pending', '=', True)], limit=batch_size)
+        for evidence in evidences:
+            try:
+                thumbnail = base64.b64encode(image_process(base64.b64decode(evidence.data), size=(256, 256)))
+            except Exception:
+                _logger.warning("Cannot generate the thumbnail of evidence %s", evidence.id, exc_info=True)
+                thumbnail = False
+            evidence.write({'thumbnail': thumbnail, 'thumbnail_pending': False})
+            self.env.cr.commit()
+        _logger.info("Safety evidence: %d thumbnails generated in %.2fs", len(evidences), time.monotonic() - start)
+        if len(evidences) == batch_size:
+            self.env.ref('insurance_module.ir_cron_safety_evidence')._trigger()
+
+    @api.model
+    def _cron_cleanup_uploads(self):
+        directory = os.path.join(config.filestore(self.env.cr.dbname), 'evidence_uploads')
+        if not os.path.isdir(directory):
+            return
+        limit = time.time() - EVIDENCE_UPLOAD_MAX_AGE
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.stat().st_mtime < limit:
+                os.unlink(entry.path)
+
+
+class SafetyEvidenceMixin(models.AbstractModel):
+    _name = 'safety.evidence.mixin'
+    _description = 'Safety Evidence Mixin'
+
+    evidence_ids = fields.Many2many('safety.evidence', string='Evidence')
@@ -0,0 +1,134 @@
+from collections import defaultdict
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+
+# Counter column kept on safety.location for each fire extinguisher state
+EXTINGUISHER_STATE_COUNTERS = {
+    'active': 'extinguisher_active_count',
+    'maintenance': 'extinguisher_maintenance_count',
+    'expired': 'extinguisher_expired_count',
+    'replaced': 'extinguisher_replaced_count',
+}
+
+
+class SafetyLocation(models.Model):
+    _name = 'safety.location'
+    _description = 'Safety Location'
+    _parent_name = 'parent_id'
+    _parent_store = True
+    _rec_name = 'complete_name'
+    _order = 'complete_name'
+
+    name = fields.Char(string='Name', required=True)
+    complete_name = fields.Char(string='Full Location Name', compute='_compute_complete_name',
+                                recursive=True, store=True)
+    parent_id = fields.Many2one('safety.location', string='Parent Location', index=True, ondelete='restrict')
+    parent_path = fields.Char(index=True, unaccent=False)
+    child_ids = fields.One2many('safety.location', 'parent_id', string='Sub-locations')
+    company_id = fields.Many2one('res.company', string='Company', required=True, index=True,
+                                 default=lambda self: self.env.company)
+    active = fields.Boolean(default=True)
+
+    # Rolled-up counters, including the extinguishers of every sub-location
+    extinguisher_active_count = fields.Integer(string='Active Extinguishers', readonly=True)
+    extinguisher_maintenance_count = fields.Integer(string='Extinguishers Under Maintenance', readonly=True)
+    extinguisher_expired_count = fields.Integer(string='Expired Extinguishers', readonly=True)
+    extinguisher_replaced_count = fields.Integer(string='Replaced Extinguishers', readonly=True)
+
+    @api.depends('name', 'parent_id.complete_name')
+    def _compute_complete_name(self):
+        for location in self:
+            if location.parent_id:
+                location.complete_name = '%s / %s' % (location.parent_id.complete_name, location.name)
+            else:
+                location.complete_name = location.name
+
+    @api.constrains('parent_id')
+    def _check_parent_id(self):
+        if self._has_cycle():
+            raise ValidationError(_('You cannot create recursive locations.'))
+
+    def write(self, vals):
+        if 'parent_id' not in vals:
+            return super(SafetyLocation, self).write(vals)
+        # A moved subtree takes its rolled-up counters from its old ancestors to
+        # its new ones. The locations are moved one at a time, as one of them
+        # may be inside another one's subtree.
+        res = True
+        for location in self:
+            old_parent = location.parent_id
+            counts = {state: location[column] for state, column in EXTINGUISHER_STATE_COUNTERS.items()}
+            res = super(SafetyLocation, location).write(vals) and res
+            if location.parent_id != old_parent:
+                deltas = {(old_parent.id, state): -count for state, count in counts.items()}
+                deltas.update({(location.parent_id.id, state): count for state, count in counts.items()})
+                self._apply_extinguisher_deltas(deltas)
+        return res
+
+    @api.model
+    def _apply_extinguisher_deltas(self, deltas):
+        """Add ``deltas`` ({(location_id, state): count}) to the counters of each
+        location and all of its ancestors."""
+        deltas = {key: delta for key, delta in deltas.items() if key[0] and delta}
+        if not deltas:
+            return
+        self.flush_model(['parent_path'])
+        locations = self.browse(list({location_id for location_id, _state in deltas})).sudo()
+        ancestors = {location.id: [int(pid) for pid in location.parent_path.split('/') if pid]
+                     for location in locations}
+        per_column = defaultdict(lambda: defaultdict(int))
+        for (location_id, state), delta in deltas.items():
+            column = EXTINGUISHER_STATE_COUNTERS.get(state)
+            if not column:
+                continue
+            for ancestor_id in ancestors.get(location_id, [location_id]):
+                per_column[column][ancestor_id] += delta
+        for column, increments in per_column.items():
+            self.env.cr.execute("""
+                UPDATE safety_location l
+                   SET {column} = COALESCE(l.{column}, 0) + v.delta
+                  FROM (VALUES {values}) AS v(id, delta)
+                 WHERE l.id = v.id
+            """.format(column=column, values=', '.join(['(%s, %s)'] * len(increments))),
+                [value for item in increments.items() for value in item])
+        self.invalidate_model(list(per_column))
+
+    @api.model
+    def _recompute_extinguisher_counts(self):
+        """Rebuild every counter from scratch with a single set-based statement,
+        for the extinguishers that existed before the counters were kept."""
+        self.env['fire.extinguisher'].flush_model(['location_id', 'state'])
+        self.flush_model(['parent_path'])
+        self.env.cr.execute("""
+            UPDATE safety_location l
+               SET extinguisher_active_count = COALESCE(c.active, 0),
+                   extinguisher_maintenance_count = COALESCE(c.maintenance, 0),
+                   extinguisher_expired_count = COALESCE(c.expired, 0),
+                   extinguisher_replaced_count = COALESCE(c.replaced, 0)
+              FROM safety_location l2
+         LEFT JOIN (
+                SELECT a.id,
+                       count(*) FILTER (WHERE f.state = 'active') AS active,
+                       count(*) FILTER (WHERE f.state = 'maintenance') AS maintenance,
+                       count(*) FILTER (WHERE f.state = 'expired') AS expired,
+                       count(*) FILTER (WHERE f.state = 'replaced') AS replaced
+                  FROM safety_location a
+                  JOIN safety_location d ON d.parent_path LIKE a.parent_path || '%'
+                  JOIN fire_extinguisher f ON f.location_id = d.id
+              GROUP BY a.id
+                   ) c ON c.id = l2.id
+             WHERE l.id = l2.id
+        """)
+        self.invalidate_model(list(EXTINGUISHER_STATE_COUNTERS.values()))
+
+    def action_view_extinguishers(self):
+        self.ensure_one()
+        return {
+            'name': _('Fire Extinguishers'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'fire.extinguisher',
+            'view_mode': 'list,form',
+            'domain': [('location_id', 'child_of', self.id)],
+            'context': {'default_location_id': self.id},
+        }
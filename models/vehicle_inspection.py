@@ -1,152 +1,234 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 from datetime import datetime, timedelta
+from markupsafe import Markup
+from odoo.tools.sql import column_exists, create_index
+
+# Checklist layout shared by the form tracking and the PDF report:
+# (section title, instructions, [(group title, [(field name, item label)])])
+CHECKLIST_SECTIONS = [
+    ('Inside the Vehicle', 'ENGINE OFF and KEY on ACC position – Inspect/Check each item thoroughly and carefully. '
+                           'Place a check mark on the box that will identify the condition of each item.', [
+        ('Service Brake System', [('service_brake_status', '')]),
+        ('Parking Brake System', [('parking_brake_status', '')]),
+        ('Door Locks', [
+            ('door_front_left_status', 'Front Left'),
+            ('door_front_right_status', 'Front Right'),
+            ('door_rear_left_status', 'Rear Left'),
+            ('door_rear_right_status', 'Rear Right'),
+            ('door_hatch_status', 'Hatch Back'),
+        ]),
+        ('Seat Belts', [
+            ('seat_belt_front_left_status', 'Front Left'),
+            ('seat_belt_front_right_status', 'Front Right'),
+        ]),
+        ('Center Rear View Mirror', [('rear_view_mirror_status', '')]),
+    ]),
+    ('Outside the Vehicle', False, [
+        ('Lighting System', [
+            ('headlight_r_high_status', 'Headlight (R) High Beam'),
+            ('headlight_r_low_status', 'Headlight (R) Low Beam'),
+            ('headlight_l_high_status', 'Headlight (L) High Beam'),
+            ('headlight_l_low_status', 'Headlight (L) Low Beam'),
+        ]),
+        ('Side Mirrors', [
+            ('side_mirror_left_status', 'Left'),
+            ('side_mirror_right_status', 'Right'),
+        ]),
+        ('Wind Shield', [
+            ('windshield_left_status', 'Left'),
+            ('windshield_right_status', 'Right'),
+        ]),
+    ]),
+    ('Engine On Checks', 'ENGINE ON – Start the engine and check each item thoroughly and carefully. '
+                         'Place a check mark on the box that will identify the condition of each item.', [
+        ('Wiper', [
+            ('wiper_left_status', 'Left'),
+            ('wiper_right_status', 'Right'),
+        ]),
+        ('Dashboard', [
+            ('warning_lamps_status', 'Warning Lamps'),
+            ('gauges_status', 'Gauges'),
+            ('mileage_info_status', 'Mileage Info'),
+        ]),
+        ('Safety Equipment', [
+            ('fire_extinguisher_status', 'Fire Extinguisher'),
+            ('first_aid_kit_status', 'First Aid Kit'),
+        ]),
+    ]),
+]
+# Days between two vehicle inspections
+INSPECTION_INTERVAL_DAYS = 90
+# Inspection fields feeding the inspection-due index on fleet.vehicle
+INSPECTION_INDEX_FIELDS = {'vehicle_id', 'inspection_date', 'state'}
+
+# Maintenance item states counted as open, and the fields feeding the
+# maintenance cost rollups on fleet.vehicle
+MAINTENANCE_OPEN_STATES = ('draft', 'scheduled', 'in_progress')
+MAINTENANCE_ROLLUP_FIELDS = {'vehicle_id', 'state', 'priority', 'cost', 'completion_date'}
+
+# Checklist items that must be OK before an inspection can be marked as passed
+SAFETY_CRITICAL_FIELDS = (
+    'service_brake_status', 'parking_brake_status',
+    'seat_belt_front_left_status', 'seat_belt_front_right_status',
+    'headlight_r_high_status', 'headlight_r_low_status', 'headlight_l_high_status', 'headlight_l_low_status',
+    'side_mirror_left_status', 'side_mirror_right_status', 'rear_view_mirror_status',
+)
+
+CHECKLIST_FIELDS = tuple(
+    fname for _section, _instructions, groups in CHECKLIST_SECTIONS
+    for _group, items in groups for fname, _label in items
+)
 
 class VehicleInspection(models.Model):
     _name = 'vehicle.inspection'
     _description = 'Vehicle Inspection'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'insurance.sequence.mixin', 'safety.evidence.mixin']
     _order = 'inspection_date desc'
 
     name = fields.Char(string='Inspection Reference', required=True, copy=False, readonly=True, default=lambda self: ('New'))
     company_id = fields.Many2one('res.company', string='Company', required=True, default=lambda self: self.env.company)
-    vehicle_id = fields.Many2one('fleet.vehicle', string='Vehicle', required=True, tracking=True)
+    vehicle_id = fields.Many2one('fleet.vehicle', string='Vehicle', required=True, tracking=True, index=True)
     inspection_date = fields.Date(string='Inspection Date', default=fields.Date.context_today, tracking=True)
-    inspector_id = fields.Many2one('res.users', string='Inspector', default=lambda self: self.env.user, tracking=True)
+    inspector_id = fields.Many2one('res.users', string='Inspector', default=lambda self: self.env.user, tracking=True, index='btree_not_null')
     mileage = fields.Float(string='Mileage (Km/Hr)', tracking=True)
 
+    # Packed checklist results ({field name: status}); the status fields below
+    # are views on it, so a save writes a single column and posts one message.
+    checklist = fields.Json(string='Checklist')
+
     # Service Brake System
     service_brake_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective')
-    ], string='Service Brake Status', tracking=True)
+    ], string='Service Brake Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
 
     # Parking Brake System
     parking_brake_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective')
-    ], string='Parking Brake Status', tracking=True)
+    ], string='Parking Brake Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
 
     # Door Locks
     door_front_left_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective')
-    ], string='Front Left Door Status', tracking=True)
+    ], string='Front Left Door Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     door_front_right_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective')
-    ], string='Front Right Door Status', tracking=True)
+    ], string='Front Right Door Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     door_rear_left_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective')
-    ], string='Rear Left Door Status', tracking=True)
+    ], string='Rear Left Door Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     door_rear_right_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective')
-    ], string='Rear Right Door Status', tracking=True)
+    ], string='Rear Right Door Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     door_hatch_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective')
-    ], string='Hatch Back Status', tracking=True)
+    ], string='Hatch Back Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
 
     # Seat Belts
     seat_belt_front_left_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective'),
         ('missing', 'Missing')
-    ], string='Front Left Seat Belt Status', tracking=True)
+    ], string='Front Left Seat Belt Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     seat_belt_front_right_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective'),
         ('missing', 'Missing')
-    ], string='Front Right Seat Belt Status', tracking=True)
+    ], string='Front Right Seat Belt Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
 
     # Center Rear View Mirror
     rear_view_mirror_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective'),
         ('missing', 'Missing')
-    ], string='Rear View Mirror Status', tracking=True)
+    ], string='Rear View Mirror Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
 
     # Lighting System
     headlight_r_high_status = fields.Selection([
         ('ok', 'OK'),
         ('fade', 'Fade-out'),
         ('defective', 'Defective')
-    ], string='Right Headlight High Beam Status', tracking=True)
+    ], string='Right Headlight High Beam Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     headlight_r_low_status = fields.Selection([
         ('ok', 'OK'),
         ('fade', 'Fade-out'),
         ('defective', 'Defective')
-    ], string='Right Headlight Low Beam Status', tracking=True)
+    ], string='Right Headlight Low Beam Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     headlight_l_high_status = fields.Selection([
         ('ok', 'OK'),
         ('fade', 'Fade-out'),
         ('defective', 'Defective')
-    ], string='Left Headlight High Beam Status', tracking=True)
+    ], string='Left Headlight High Beam Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     headlight_l_low_status = fields.Selection([
         ('ok', 'OK'),
         ('fade', 'Fade-out'),
         ('defective', 'Defective')
-    ], string='Left Headlight Low Beam Status', tracking=True)
+    ], string='Left Headlight Low Beam Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
 
     # Side Mirrors
     side_mirror_left_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective'),
         ('missing', 'Missing')
-    ], string='Left Side Mirror Status', tracking=True)
+    ], string='Left Side Mirror Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     side_mirror_right_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective'),
         ('missing', 'Missing')
-    ], string='Right Side Mirror Status', tracking=True)
+    ], string='Right Side Mirror Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
 
     # Wind Shield
     windshield_left_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective'),
         ('missing', 'Missing')
-    ], string='Left Windshield Status', tracking=True)
+    ], string='Left Windshield Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     windshield_right_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective'),
         ('missing', 'Missing')
-    ], string='Right Windshield Status', tracking=True)
+    ], string='Right Windshield Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
 
     # Wiper
     wiper_left_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective'),
         ('missing', 'Missing')
-    ], string='Left Wiper Status', tracking=True)
+    ], string='Left Wiper Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     wiper_right_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective'),
         ('missing', 'Missing')
-    ], string='Right Wiper Status', tracking=True)
+    ], string='Right Wiper Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
 
     # Dashboard
     warning_lamps_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective')
-    ], string='Warning Lamps Status', tracking=True)
+    ], string='Warning Lamps Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     gauges_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective')
-    ], string='Gauges Status', tracking=True)
+    ], string='Gauges Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     mileage_info_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective')
-    ], string='Mileage Info Status', tracking=True)
+    ], string='Mileage Info Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     fire_extinguisher_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective')
-    ], string='Fire Extinguisher Status', tracking=True)
+    ], string='Fire Extinguisher Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
     first_aid_kit_status = fields.Selection([
         ('ok', 'OK'),
         ('defective', 'Defective')
-    ], string='First Aid Kit Status', tracking=True)
+    ], string='First Aid Kit Status', compute='_compute_checklist_items', inverse='_inverse_checklist_items')
 
     findings = fields.Text(string='Inspection Results', tracking=True)
     recommendations = fields.Text(string='Recommendations', tracking=True)
@@ -156,25 +238,97 @@ class VehicleInspection(models.Model):
         ('done', 'Done'),
         ('cancelled', 'Cancelled')
     ], string='Status', default='draft', tracking=True)
+    result = fields.Selection([
+        ('passed', 'Passed'),
+        ('failed', 'Failed'),
+        ('maintenance', 'Needs Maintenance')
+    ], string='Result', copy=False, tracking=True)
 
     maintenance_ids = fields.One2many('vehicle.inspection.maintenance', 'inspection_id', string='Maintenance Items')
     attachment_ids = fields.Many2many('ir.attachment', string='Attachments')
 
+    def init(self):
+        # Pack the results of the former per-item columns into the checklist,
+        # clearing them so that a later update does not pack them again
+        if column_exists(self._cr, self._table, CHECKLIST_FIELDS[0]):
+            self._cr.execute("""
+                UPDATE vehicle_inspection
+                   SET checklist = COALESCE(checklist, '{}'::jsonb) || jsonb_strip_nulls(jsonb_build_object(%s)),
+                       %s
+                 WHERE %s
+            """ % (
+                ', '.join("'%s', %s" % (fname, fname) for fname in CHECKLIST_FIELDS),
+                ', '.join('%s = NULL' % fname for fname in CHECKLIST_FIELDS),
+                ' OR '.join('%s IS NOT NULL' % fname for fname in CHECKLIST_FIELDS),
+            ))
+        # The own-records rule filters on the creator
+        create_index(self._cr, 'vehicle_inspection_create_uid_index', self._table, ['create_uid'])
+
+    @api.depends('checklist')
+    def _compute_checklist_items(self):
+        for record in self:
+            checklist = record.checklist or {}
+            for fname in CHECKLIST_FIELDS:
+                record[fname] = checklist.get(fname, False)
+
+    def _inverse_checklist_items(self):
+        for record in self:
+            record.checklist = {fname: record[fname] for fname in CHECKLIST_FIELDS if record[fname]}
+
+    def write(self, vals):
+        vehicles = self.vehicle_id if INSPECTION_INDEX_FIELDS & vals.keys() else None
+        if self.env.context.get('checklist_tracking_done') or (
+                'checklist' not in vals and not any(fname in vals for fname in CHECKLIST_FIELDS)):
+            res = super().write(vals)
+        else:
+            previous = {record.id: dict(record.checklist or {}) for record in self}
+            # The inverse writes the checklist again, only the outer write posts the message
+            res = super(VehicleInspection, self.with_context(checklist_tracking_done=True)).write(vals)
+            self._post_checklist_changes(previous)
+        if vehicles is not None:
+            (vehicles | self.vehicle_id)._refresh_inspection_index()
+        return res
+
+    def unlink(self):
+        vehicles = self.vehicle_id
+        res = super().unlink()
+        vehicles._refresh_inspection_index()
+        return res
+
+    def _post_checklist_changes(self, previous):
+        """Post one consolidated message per inspection listing the changed checklist items."""
+        for record in self:
+            old, new = previous.get(record.id, {}), record.checklist or {}
+            lines = []
+            for fname in CHECKLIST_FIELDS:
+                if old.get(fname) != new.get(fname):
+                    field = self._fields[fname]
+                    selection = dict(field._description_selection(self.env))
+                    lines.append(Markup('<li>%s: %s → %s</li>') % (
+                        field._description_string(self.env),
+                        selection.get(old.get(fname), '-'),
+                        selection.get(new.get(fname), '-'),
+                    ))
+            if lines:
+                record.message_post(body=Markup('<p>%s</p><ul>%s</ul>') % (
+                    _('Checklist updated'), Markup('').join(lines)))
+
     @api.depends('inspection_date')
     def _compute_next_inspection_date(self):
         for record in self:
             if record.inspection_date:
-                record.next_inspection_date = fields.Date.from_string(record.inspection_date) + timedelta(days=90)
+                record.next_inspection_date = fields.Date.from_string(record.inspection_date) + timedelta(days=INSPECTION_INTERVAL_DAYS)
 
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get('name', 'New') == 'New':
-                vals['name'] = self.env['ir.sequence'].next_by_code('vehicle.inspection') or 'New'
-        return super().create(vals_list)
+        self._assign_sequence_names(vals_list, 'New')
+        # Initial checklist values are not changes, do not post them
+        records = super(VehicleInspection, self.with_context(checklist_tracking_done=True)).create(vals_list)
+        records.vehicle_id._refresh_inspection_index()
+        return records.with_env(self.env)
 
     def action_draft(self):
-        self.write({'state': 'draft'})
+        self.write({'state': 'draft', 'result': False})
 
     def action_in_progress(self):
         self.write({'state': 'in_progress'})
@@ -186,31 +340,67 @@ class VehicleInspection(models.Model):
         self.write({'state': 'cancelled'})
 
     def action_start_inspection(self):
-        # Create a default maintenance record if none exists
-        if not self.maintenance_ids:
-            self.env['vehicle.inspection.maintenance'].create({
-                'inspection_id': self.id,
-                'vehicle_id': self.vehicle_id.id,
-                'name': 'Initial Inspection',
-                'priority': '1',
-                'state': 'draft'
-            })
-        self.write({'state': 'in_progress'})
+        # Create a default maintenance record for the inspections that have none
+        to_start = self.filtered(lambda r: r.state == 'draft')
+        self.env['vehicle.inspection.maintenance'].create([{
+            'inspection_id': record.id,
+            'vehicle_id': record.vehicle_id.id,
+            'name': 'Initial Inspection',
+            'priority': '1',
+            'state': 'draft'
+        } for record in to_start.filtered(lambda r: not r.maintenance_ids)])
+        to_start.write({'state': 'in_progress'})
+        return self._notify_result_failures([
+            (record, _('Only draft inspections can be started.')) for record in self - to_start])
+
+    def _check_result_transition(self, result):
+        """Return the inspections that can be given ``result`` and a list of
+        (inspection, reason) for the others."""
+        failures = []
+        for record in self:
+            if record.state != 'in_progress':
+                failures.append((record, _('Only inspections in progress can be given a result.')))
+            elif result == 'passed':
+                checklist = record.checklist or {}
+                missing = [fname for fname in SAFETY_CRITICAL_FIELDS if checklist.get(fname) != 'ok']
+                if missing:
+                    failures.append((record, _('Safety-critical checks not OK: %s',
+                                               ', '.join(self._fields[fname]._description_string(self.env)
+                                                         for fname in missing))))
+        failed = self.browse([record.id for record, _reason in failures])
+        return self - failed, failures
+
+    def _set_result(self, result):
+        """Give ``result`` to every valid inspection with a single write and
+        return the (inspection, reason) list of the rejected ones."""
+        valid, failures = self._check_result_transition(result)
+        valid.write({'state': 'done', 'result': result})
+        return failures
+
+    @api.model
+    def _notify_result_failures(self, failures):
+        if not failures:
+            return True
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('%s inspection(s) could not be processed', len(failures)),
+                'message': '\n'.join('%s: %s' % (record.name, reason) for record, reason in failures),
+                'type': 'warning',
+                'sticky': True,
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
 
     def action_mark_failed(self):
-        self.write({'state': 'failed'})
+        return self._notify_result_failures(self._set_result('failed'))
 
     def action_mark_passed(self):
-        required_checks = [
-            self.light_signals, self.seat_belts, self.mirrors, self.horn,
-            self.transmission, self.steering, self.exhaust
-        ]
-        if not all(required_checks):
-            raise ValidationError(_('All safety-critical checks must pass before marking inspection as passed.'))
-        self.write({'state': 'passed'})
+        return self._notify_result_failures(self._set_result('passed'))
 
     def action_needs_maintenance(self):
-        self.write({'state': 'maintenance'})
+        return self._notify_result_failures(self._set_result('maintenance'))
 
     def action_schedule_maintenance(self):
         return {
@@ -258,7 +448,53 @@ class VehicleInspectionMaintenance(models.Model):
     completion_date = fields.Date(string='Completion Date')
     cost = fields.Float(string='Estimated Cost')
     notes = fields.Text(string='Notes')
-    
+
+    def _get_rollup_deltas(self, sign=1):
+        """Return the contribution of these items to the rollups of their vehicle,
+        as {vehicle_id: [open, critical, open cost, completed cost this year]}."""
+        year = fields.Date.context_today(self).year
+        deltas = {}
+        for item in self:
+            delta = deltas.setdefault(item.vehicle_id.id, [0, 0, 0.0, 0.0])
+            if item.state in MAINTENANCE_OPEN_STATES:
+                delta[0] += sign
+                delta[1] += sign if item.priority == '3' else 0
+                delta[2] += sign * item.cost
+            elif item.state == 'done' and item.completion_date and item.completion_date.year == year:
+                delta[3] += sign * item.cost
+        return deltas
+
+    @api.model
+    def _merge_rollup_deltas(self, *all_deltas):
+        merged = {}
+        for deltas in all_deltas:
+            for vehicle_id, delta in deltas.items():
+                total = merged.setdefault(vehicle_id, [0, 0, 0.0, 0.0])
+                for index, value in enumerate(delta):
+                    total[index] += value
+        return merged
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(VehicleInspectionMaintenance, self).create(vals_list)
+        self.env['fleet.vehicle']._apply_maintenance_deltas(records._get_rollup_deltas())
+        return records
+
+    def write(self, vals):
+        if not MAINTENANCE_ROLLUP_FIELDS & vals.keys():
+            return super(VehicleInspectionMaintenance, self).write(vals)
+        before = self._get_rollup_deltas(-1)
+        res = super(VehicleInspectionMaintenance, self).write(vals)
+        self.env['fleet.vehicle']._apply_maintenance_deltas(
+            self._merge_rollup_deltas(before, self._get_rollup_deltas()))
+        return res
+
+    def unlink(self):
+        deltas = self._get_rollup_deltas(-1)
+        res = super(VehicleInspectionMaintenance, self).unlink()
+        self.env['fleet.vehicle']._apply_maintenance_deltas(deltas)
+        return res
+
     def action_schedule(self):
         if not self.scheduled_date:
             raise ValidationError(_('Please set a scheduled date before scheduling maintenance.'))
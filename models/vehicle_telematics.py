@@ -0,0 +1,77 @@
+import numpy as np
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools.sql import create_index
+
+# Deceleration (km/h lost per second) above which a sample counts as harsh braking
+HARSH_BRAKING_DECELERATION = 12.0
+
+
+class VehicleTelematicsSample(models.Model):
+    _name = 'vehicle.telematics.sample'
+    _description = 'Vehicle Telematics Sample'
+    _order = 'vehicle_id, timestamp'
+    _log_access = False
+
+    vehicle_id = fields.Many2one('fleet.vehicle', string='Vehicle', required=True, ondelete='cascade')
+    timestamp = fields.Datetime(string='Timestamp', required=True)
+    speed = fields.Float(string='Speed (km/h)')
+    odometer = fields.Float(string='Odometer (km)')
+    harsh_braking = fields.Boolean(string='Harsh Braking Event')
+    latitude = fields.Float(string='Latitude', digits=(10, 7))
+    longitude = fields.Float(string='Longitude', digits=(10, 7))
+
+    def init(self):
+        create_index(self._cr, 'vehicle_telematics_sample_vehicle_timestamp_index',
+                     self._table, ['vehicle_id', 'timestamp'])
+
+    def write(self, vals):
+        raise UserError(_('Telematics samples are append-only and cannot be modified.'))
+
+    @api.model
+    def _get_series(self, vehicle, start, end):
+        """Return the samples of ``vehicle`` between ``start`` and ``end`` as NumPy arrays."""
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT EXTRACT(EPOCH FROM timestamp), speed, odometer, harsh_braking
+              FROM vehicle_telematics_sample
+             WHERE vehicle_id = %s AND timestamp BETWEEN %s AND %s
+          ORDER BY timestamp
+        """, (vehicle.id, start, end))
+        rows = self.env.cr.fetchall()
+        if not rows:
+            return None
+        epoch, speed, odometer, braking = zip(*rows)
+        return {
+            'time': np.asarray(epoch, dtype=np.float64),
+            'speed': np.nan_to_num(np.asarray(speed, dtype=np.float64)),
+            'odometer': np.nan_to_num(np.asarray(odometer, dtype=np.float64)),
+            'harsh_braking': np.asarray(braking, dtype=bool),
+        }
+
+    @api.model
+    def _aggregate_series(self, series, speed_limit):
+        """Vectorized aggregation of a sample series into the incident telematics figures."""
+        time, speed, odometer = series['time'], series['speed'], series['odometer']
+        delta_hours = np.diff(time) / 3600.0
+        moving = speed[:-1] > 0
+        if np.count_nonzero(odometer):
+            distance = float(odometer.max() - odometer[odometer > 0].min())
+        else:
+            # Trapezoidal integration of the speed curve when no odometer is reported
+            distance = float(np.sum((speed[1:] + speed[:-1]) / 2.0 * delta_hours))
+        over_limit = speed > speed_limit
+        deceleration = -np.diff(speed) / np.maximum(np.diff(time), 1.0)
+        braking = series['harsh_braking'].copy()
+        braking[1:] |= deceleration >= HARSH_BRAKING_DECELERATION
+        return {
+            'time_travelled': float(np.sum(delta_hours[moving])),
+            'distance_travelled': distance,
+            'max_speed': float(speed.max()),
+            'speed_at_incident': float(speed[-1]),
+            'speed_before_accident': float(speed[-2] if len(speed) > 1 else speed[-1]),
+            # Count episodes (rising edges) rather than individual samples
+            'speed_violations': int(over_limit[0] + np.count_nonzero(over_limit[1:] & ~over_limit[:-1])),
+            'harsh_braking': int(braking[0] + np.count_nonzero(braking[1:] & ~braking[:-1])),
+        }
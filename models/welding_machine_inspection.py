@@ -1,16 +1,17 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
 
 class WeldingMachineInspection(models.Model):
     _name = 'welding.machine.inspection'
     _description = 'Welding Machine Inspection'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'insurance.sequence.mixin', 'safety.evidence.mixin']
     _order = 'inspection_date desc'
 
     name = fields.Char(string='Document No.', required=True, copy=False, readonly=True, default=lambda self: _('New'))
     company_id = fields.Many2one('res.company', string='Company', required=True, default=lambda self: self.env.company)
     inspection_date = fields.Date(string='Date of Inspection', required=True, default=fields.Date.context_today, tracking=True)
-    inspector_id = fields.Many2one('res.users', string='Inspection Done By', required=True, default=lambda self: self.env.user, tracking=True)
+    inspector_id = fields.Many2one('res.users', string='Inspection Done By', required=True, index=True, default=lambda self: self.env.user, tracking=True)
     reviewer_id = fields.Many2one('res.users', string='Reviewed by')
     sign_inspector = fields.Char(string='Sign with date (Inspector)')
     sign_reviewer = fields.Char(string='Sign with date (Reviewer)')
@@ -61,11 +62,13 @@ class WeldingMachineInspection(models.Model):
     notes = fields.Text(string='Additional Notes')
     attachment_ids = fields.Many2many('ir.attachment', string='Attachments')
 
+    def init(self):
+        # The own-records rule filters on the creator
+        create_index(self._cr, 'welding_machine_inspection_create_uid_index', self._table, ['create_uid'])
+
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get('name', _('New')) == _('New'):
-                vals['name'] = self.env['ir.sequence'].next_by_code('welding.machine.inspection') or _('New')
+        self._assign_sequence_names(vals_list)
         return super(WeldingMachineInspection, self).create(vals_list)
 
     def action_start_inspection(self):
@@ -1,5 +1,7 @@
 from odoo import models, fields, api, _
 
+from ..models.vehicle_inspection import CHECKLIST_SECTIONS
+
 class VehicleInspectionReport(models.AbstractModel):
     _name = 'report.insurance_module.report_vehicle_inspection'
     _description = 'Vehicle Inspection Report'
@@ -14,8 +16,34 @@ class VehicleInspectionReport(models.AbstractModel):
             'data': data,
             'get_status_display': self._get_status_display,
             'get_checkbox': self._get_checkbox,
+            'get_checklist_sections': self._get_checklist_sections,
         }
 
+    def _get_checklist_sections(self, doc):
+        """Helper method to lay out the packed checklist of an inspection"""
+        checklist = doc.checklist or {}
+        sections = []
+        number = 0
+        for title, instructions, groups in CHECKLIST_SECTIONS:
+            if instructions:
+                number = 0
+            rows = []
+            for group_title, items in groups:
+                number += 1
+                rows.append({
+                    'number': number,
+                    'title': group_title,
+                    'items': [{
+                        'label': label,
+                        'options': [
+                            (option_label, checklist.get(fname) == value)
+                            for value, option_label in doc._fields[fname].selection
+                        ],
+                    } for fname, label in items],
+                })
+            sections.append({'title': title, 'instructions': instructions, 'rows': rows})
+        return sections
+
     def _get_status_display(self, status):
         """Helper method to get display value for status fields"""
         status_map = {
@@ -0,0 +1,3 @@
+from . import test_incident_report
+from . import test_ir_sequence
+from . import test_insurance_claim
@@ -0,0 +1,143 @@
+import logging
+import time
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import SQL
+from odoo.tools.sql import index_exists
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('post_install', '-at_install')
+class TestIncidentReportLastServiceDate(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        brand = cls.env['fleet.vehicle.model.brand'].create({'name': 'Test Brand'})
+        model = cls.env['fleet.vehicle.model'].create({'name': 'Test Model', 'brand_id': brand.id})
+        cls.vehicles = cls.env['fleet.vehicle'].create([
+            {'model_id': model.id, 'license_plate': 'TEST-%02d' % index} for index in range(10)
+        ])
+        cls.env['fleet.vehicle.log.services'].create([
+            {'vehicle_id': vehicle.id, 'date': '2024-%02d-%02d' % (month, index + 1)}
+            for index, vehicle in enumerate(cls.vehicles) for month in (1, 3, 2)
+        ])
+        cls.employee = cls.env['hr.employee'].create({'name': 'Test Driver'})
+        cls.incidents = cls.env['incident.report'].create([{
+            'employee_id': cls.employee.id,
+            'driver_id': cls.employee.id,
+            'vehicle_id': vehicle.id,
+        } for vehicle in cls.vehicles for _i in range(4)])
+
+    def test_last_service_date_values(self):
+        for incident in self.incidents:
+            index = self.vehicles.ids.index(incident.vehicle_id.id)
+            self.assertEqual(str(incident.last_service_date), '2024-03-%02d' % (index + 1))
+
+    def _count_compute_queries(self, incidents):
+        self.env.flush_all()
+        incidents.mapped('vehicle_id')
+        count = self.cr.sql_log_count
+        incidents._compute_last_service_date()
+        return self.cr.sql_log_count - count
+
+    def test_last_service_date_single_query(self):
+        """The compute reads the services of the whole recordset in one grouped
+        query, whatever the number of incidents."""
+        incidents = self.incidents
+        with self.assertQueryCount(1):
+            self._count_compute_queries(incidents)
+        self.assertEqual(len(set(incidents.mapped('last_service_date'))), len(self.vehicles))
+        self.assertEqual(len(incidents), 40)
+        self.assertEqual(self._count_compute_queries(incidents[:2]), self._count_compute_queries(incidents))
+
+
+@tagged('post_install', '-at_install')
+class TestIncidentReportIndexes(TransactionCase):
+    """The hot access paths of incident.report use their index on a realistic volume."""
+
+    INCIDENT_COUNT = 50000
+    INDEXES = ('incident_report_datetime_id_index',
+               'incident_report_company_state_datetime_index',
+               'incident_report_open_state_index',
+               'incident_report_create_uid_index')
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.env['res.users'].create({'name': 'Test Safety Clerk', 'login': 'test_safety_clerk'})
+        employee = cls.env['hr.employee'].create({'name': 'Test Driver'})
+        template = cls.env['incident.report'].create({
+            'employee_id': employee.id,
+            'driver_id': employee.id,
+        })
+        cls.env.flush_all()
+        # Copy the template over several years of history: most incidents are
+        # resolved or closed, and few were entered by the same user
+        cls.env.cr.execute("""
+            SELECT column_name FROM information_schema.columns
+             WHERE table_name = 'incident_report' AND column_name != 'id'
+        """)
+        columns = [row[0] for row in cls.env.cr.fetchall()]
+        overrides = {
+            'name': SQL("'TEST/' || g"),
+            'state': SQL("""CASE WHEN mod(g, 20) < 17 THEN (ARRAY['resolved', 'closed'])[1 + mod(g, 2)]
+                                 ELSE (ARRAY['draft', 'reported', 'investigation', 'action'])[1 + mod(g / 20, 4)] END"""),
+            'incident_datetime': SQL("(now() AT TIME ZONE 'UTC') - g * interval '47 minutes'"),
+            'create_uid': SQL("CASE WHEN mod(g, 200) = 0 THEN %s ELSE t.create_uid END", cls.user.id),
+        }
+        cls.env.cr.execute(SQL(
+            "INSERT INTO incident_report (%s) SELECT %s FROM incident_report t, generate_series(1, %s) g WHERE t.id = %s",
+            SQL(", ").join(SQL.identifier(column) for column in columns),
+            SQL(", ").join(overrides.get(column, SQL.identifier('t', column)) for column in columns),
+            cls.INCIDENT_COUNT, template.id,
+        ))
+        cls.env.cr.execute("ANALYZE incident_report")
+
+    def _access_paths(self):
+        """Return the searches of the list view, its status filters, the
+        company kanban and the own-records rule, by name."""
+        return {
+            'list': [],
+            'open': [('state', '=', 'action')],
+            'company_state': [('company_id', '=', self.env.company.id), ('state', '=', 'reported')],
+            'own': [('create_uid', '=', self.user.id)],
+        }
+
+    def _explain(self, domain):
+        query = self.env['incident.report']._search(domain, limit=80)
+        self.env.cr.execute(SQL("EXPLAIN %s", query.select()))
+        return '\n'.join(row[0] for row in self.env.cr.fetchall())
+
+    def _search_latencies(self, repeat=20):
+        Incident = self.env['incident.report']
+        latencies = {}
+        for name, domain in self._access_paths().items():
+            start = time.monotonic()
+            for _i in range(repeat):
+                Incident.search(domain, limit=80)
+            latencies[name] = (time.monotonic() - start) * 1000 / repeat
+        return latencies
+
+    def test_indexes_exist(self):
+        for name in self.INDEXES:
+            self.assertTrue(index_exists(self.env.cr, name), name)
+
+    def test_access_paths_use_indexes(self):
+        plans = {name: self._explain(domain) for name, domain in self._access_paths().items()}
+        for name, plan in plans.items():
+            self.assertNotIn('Seq Scan on incident_report', plan, name)
+        self.assertIn('incident_report_datetime_id_index', plans['list'])
+        self.assertIn('incident_report_create_uid_index', plans['own'])
+        self.assertTrue(any(index in plans['open'] for index in self.INDEXES[1:3]), plans['open'])
+        self.assertTrue(any(index in plans['company_state'] for index in self.INDEXES[1:3]), plans['company_state'])
+
+    def test_search_latency(self):
+        with_indexes = self._search_latencies()
+        for name in self.INDEXES:
+            self.env.cr.execute(SQL("DROP INDEX %s", SQL.identifier(name)))
+        without_indexes = self._search_latencies()
+        for name in with_indexes:
+            _logger.info("incident.report %s search on %d incidents: %.2fms with indexes, %.2fms without",
+                         name, self.INCIDENT_COUNT, with_indexes[name], without_indexes[name])
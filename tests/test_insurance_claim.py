@@ -0,0 +1,110 @@
+import logging
+import time
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('post_install', '-at_install')
+class TestInsuranceClaimTransition(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        employee = cls.env['hr.employee'].create({'name': 'Test Claimant'})
+        incident = cls.env['incident.report'].create({
+            'employee_id': employee.id,
+            'driver_id': employee.id,
+        })
+        insurance_type = cls.env['insurance.type'].create({'name': 'Test Motor', 'code': 'TMOT'})
+        cls.claims = cls.env['insurance.claim'].create([{
+            'incident_id': incident.id,
+            'employee_id': employee.id,
+            'insurance_type_id': insurance_type.id,
+            'amount': 100.0 * (index + 1),
+        } for index in range(50)])
+
+    def _message_counts(self):
+        return dict(self.env['mail.message']._read_group(
+            [('model', '=', 'insurance.claim'), ('res_id', 'in', self.claims.ids)],
+            groupby=['res_id'], aggregates=['__count'],
+        ))
+
+    def test_bulk_transition_logs_one_message_per_claim(self):
+        before = self._message_counts()
+        self.claims.action_submit()
+        self.assertEqual(set(self.claims.mapped('state')), {'submitted'})
+        after = self._message_counts()
+        for claim in self.claims:
+            self.assertEqual(after.get(claim.id, 0) - before.get(claim.id, 0), 1, claim.name)
+
+    def test_invalid_transition_changes_nothing(self):
+        self.claims[:10].action_submit()
+        with self.assertRaises(UserError):
+            self.claims.action_approve()
+        self.assertEqual(set(self.claims[:10].mapped('state')), {'submitted'})
+        self.assertEqual(set(self.claims[10:].mapped('state')), {'draft'})
+
+    def test_reject_only_from_submitted(self):
+        self.claims[:10].action_submit()
+        self.claims[:5].action_approve()
+        for claims in (self.claims[10:], self.claims[:5]):
+            with self.assertRaises(UserError):
+                claims.action_reject()
+        self.claims[5:10].action_reject()
+        self.assertEqual(set(self.claims[5:10].mapped('state')), {'rejected'})
+
+    def test_reset_to_draft_only_from_rejected(self):
+        self.claims[:10].action_submit()
+        self.claims[:5].action_reject()
+        for claims in (self.claims[5:10], self.claims[10:]):
+            with self.assertRaises(UserError):
+                claims.action_reset_to_draft()
+        self.claims[:5].action_reset_to_draft()
+        self.assertEqual(set(self.claims[:10].mapped('state')), {'draft', 'submitted'})
+        self.assertEqual(set(self.claims[:5].mapped('state')), {'draft'})
+
+
+@tagged('post_install', '-at_install')
+class TestInsuranceClaimBulkTransition(TransactionCase):
+
+    CLAIM_COUNT = 1000
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        employee = cls.env['hr.employee'].create({'name': 'Test Claimant'})
+        incident = cls.env['incident.report'].create({
+            'employee_id': employee.id,
+            'driver_id': employee.id,
+        })
+        insurance_type = cls.env['insurance.type'].create({'name': 'Test Motor', 'code': 'TMOT'})
+        cls.claims = cls.env['insurance.claim'].with_context(tracking_disable=True).create([{
+            'incident_id': incident.id,
+            'employee_id': employee.id,
+            'insurance_type_id': insurance_type.id,
+            'amount': 100.0 + index,
+        } for index in range(cls.CLAIM_COUNT)])
+
+    def test_bulk_transition_writes_and_logs_once(self):
+        """Submitting a thousand claims costs a single write, a single batch of
+        audit messages and a number of queries that does not grow with the claims."""
+        self.env.flush_all()
+        self.env.invalidate_all()
+        Claim, Message = self.registry['insurance.claim'], self.registry['mail.message']
+        with patch.object(Claim, 'write', autospec=True, side_effect=Claim.write) as write, \
+                patch.object(Message, 'create', autospec=True, side_effect=Message.create) as create, \
+                self.assertQueryCount(20):
+            start = time.monotonic()
+            self.claims.action_submit()
+            self.env.flush_all()
+            elapsed = time.monotonic() - start
+        _logger.info("%d claims submitted in %.2fs (%.0f claims/s)",
+                     self.CLAIM_COUNT, elapsed, self.CLAIM_COUNT / elapsed)
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(create.call_count, 1)
+        self.assertEqual(len(create.call_args.args[1]), self.CLAIM_COUNT)
+        self.assertEqual(set(self.claims.mapped('state')), {'submitted'})
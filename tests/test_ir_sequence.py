@@ -0,0 +1,135 @@
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from psycopg2 import OperationalError, errorcodes
+
+from odoo import api, SUPERUSER_ID
+from odoo.modules.registry import Registry
+from odoo.tests.common import BaseCase, get_db_name, tagged
+from odoo.tools import mute_logger
+
+_logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def environment():
+    """Return an environment with a new cursor for the current database; the
+    cursor is committed and closed after the context block."""
+    registry = Registry(get_db_name())
+    with registry.cursor() as cr:
+        yield api.Environment(cr, SUPERUSER_ID, {})
+
+
+@tagged('post_install', '-at_install')
+class TestSequenceBlock(BaseCase):
+    """Blocks reserved from concurrent transactions never share a number."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with environment() as env:
+            cls.sequence_ids = env['ir.sequence'].create([{
+                'name': 'Test Insurance Block Standard',
+                'code': 'test.insurance.block.standard',
+                'implementation': 'standard',
+            }, {
+                'name': 'Test Insurance Block No Gap',
+                'code': 'test.insurance.block.no_gap',
+                'implementation': 'no_gap',
+            }]).ids
+
+    @classmethod
+    def tearDownClass(cls):
+        with environment() as env:
+            env['ir.sequence'].browse(cls.sequence_ids).unlink()
+        super().tearDownClass()
+
+    def test_standard_blocks_do_not_overlap(self):
+        with environment() as env0, environment() as env1:
+            names0 = env0['ir.sequence'].next_block_by_code('test.insurance.block.standard', 50)
+            names1 = env1['ir.sequence'].next_block_by_code('test.insurance.block.standard', 50)
+            names2 = env0['ir.sequence'].next_block_by_code('test.insurance.block.standard', 50)
+        self.assertEqual(len(set(names0)), 50)
+        self.assertEqual(len(set(names1)), 50)
+        self.assertFalse(set(names0) & set(names1))
+        self.assertFalse((set(names0) | set(names1)) & set(names2))
+
+    def test_no_gap_blocks_are_serialized(self):
+        with environment() as env0:
+            with environment() as env1:
+                names0 = env0['ir.sequence'].next_block_by_code('test.insurance.block.no_gap', 50)
+                env1.cr.execute("SET LOCAL lock_timeout = '100ms'")
+                # The second transaction waits for the first one to end
+                with self.assertRaises(OperationalError) as e, mute_logger('odoo.sql_db'):
+                    env1['ir.sequence'].next_block_by_code('test.insurance.block.no_gap', 50)
+                self.assertEqual(e.exception.pgcode, errorcodes.LOCK_NOT_AVAILABLE)
+        with environment() as env2:
+            names2 = env2['ir.sequence'].next_block_by_code('test.insurance.block.no_gap', 50)
+        self.assertEqual([int(name) for name in names0], list(range(1, 51)))
+        self.assertEqual([int(name) for name in names2], list(range(51, 101)))
+
+
+@tagged('post_install', '-at_install')
+class TestSequenceMixinConcurrency(BaseCase):
+    """Records of a sequence mixin model created by concurrent workers get
+    unique, well formed references."""
+
+    WORKERS = 4
+    BATCHES = 5
+    BATCH_SIZE = 50
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.claim_ids = []
+        with environment() as env:
+            employee = env['hr.employee'].create({'name': 'Test Concurrent Claimant'})
+            incident = env['incident.report'].create({
+                'employee_id': employee.id,
+                'driver_id': employee.id,
+            })
+            insurance_type = env['insurance.type'].create({'name': 'Test Concurrent Motor', 'code': 'TCMOT'})
+            cls.employee_id, cls.incident_id, cls.insurance_type_id = employee.id, incident.id, insurance_type.id
+
+    @classmethod
+    def tearDownClass(cls):
+        with environment() as env:
+            env['insurance.claim'].browse(cls.claim_ids).unlink()
+            env['incident.report'].browse(cls.incident_id).unlink()
+            env['insurance.type'].browse(cls.insurance_type_id).unlink()
+            env['hr.employee'].browse(cls.employee_id).unlink()
+        super().tearDownClass()
+
+    def _create_claims(self, worker):
+        """Create the claims of one worker, one transaction per batch."""
+        ids = []
+        for batch in range(self.BATCHES):
+            with environment() as env:
+                claims = env['insurance.claim'].with_context(tracking_disable=True).create([{
+                    'incident_id': self.incident_id,
+                    'employee_id': self.employee_id,
+                    'insurance_type_id': self.insurance_type_id,
+                    'amount': 100.0 * (worker + 1),
+                } for _index in range(self.BATCH_SIZE)])
+                ids += claims.ids
+        return ids
+
+    def test_concurrent_creates_get_unique_names(self):
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as executor:
+            for ids in executor.map(self._create_claims, range(self.WORKERS)):
+                self.claim_ids += ids
+        duration = time.monotonic() - start
+        count = self.WORKERS * self.BATCHES * self.BATCH_SIZE
+        _logger.info("%d claims created by %d workers in %.2fs (%.0f records/s)",
+                     count, self.WORKERS, duration, count / duration)
+
+        self.assertEqual(len(self.claim_ids), count)
+        with environment() as env:
+            names = env['insurance.claim'].browse(self.claim_ids).mapped('name')
+        self.assertEqual(len(set(names)), count)
+        for name in names:
+            self.assertRegex(name, re.compile(r'^CLM/\d{4}/\d{5,}$'))